@@ -0,0 +1,396 @@
+"""
+The evolutionary algorithm scheduling method. An individual is an order of processing: a permutation of the indices of a
+ProcessTable. Its fitness is the mean waiting time of the processes if they are processed one after the other without
+any idle time. A process that would end before it arrived is penalised with abs(waiting time - arrival time).
+The DEAP types and operators are set up once, on the first run (see setup). An EvolutionaryAlgorithm holds the
+parameters and can be used for any number of runs. All of its randomness comes from its own random number generator,
+so a run with a seed can be repeated.
+"""
+
+import atexit
+import hashlib
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from operator import attrgetter
+from typing import List
+
+import numpy as np
+
+from ProcessTable import ProcessTable
+
+# DEAP is only imported by setup(), so importing this module (and the Scheduler) stays fast.
+creator = None
+tools = None
+toolbox = None
+setup_lock = threading.Lock()  # Runs in many threads (e.g. of the app) must not set DEAP up at the same time.
+
+worker_pools = {}  # Number of workers -> process pool for the fitness, created once and shared by every run.
+pools_lock = threading.Lock()  # Runs in many threads must not create two pools for the same number of workers.
+# Inside a worker process: hash of a process table -> its durations and arrival times. The columns are only sent to a
+# worker once, after that the hash is enough.
+worker_columns = {}
+WORKER_TABLES = 4  # Number of tables a worker keeps the columns of.
+# Process table -> (digest, population) of the population the latest run on these processes ended with. A table never
+# changes, and an entry is gone as soon as nothing else uses its table anymore.
+populations = weakref.WeakKeyDictionary()
+
+
+def get_worker_pool(workers: int) -> ProcessPoolExecutor:
+    """Returns the process pool with the given number of workers. It is only created on the first call."""
+    with pools_lock:
+        if workers not in worker_pools:
+            worker_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return worker_pools[workers]
+
+
+def drop_worker_pool(workers: int, pool: ProcessPoolExecutor):
+    """Forgets a pool that is broken (e.g. a worker process died), so the next run gets a new one. Another thread may
+    have replaced it already, that one is kept."""
+    with pools_lock:
+        if worker_pools.get(workers) is pool:
+            del worker_pools[workers]
+    pool.shutdown(wait=False)
+
+
+@atexit.register
+def shutdown_worker_pools():
+    """Stops the worker processes of all pools, it's called when the interpreter exits. Fitness chunks that still wait
+    are not needed anymore, the runs that wanted them are gone."""
+    with pools_lock:
+        for pool in worker_pools.values():
+            pool.shutdown(wait=False)
+        worker_pools.clear()
+
+
+def worker_fitness(permutations: np.ndarray, table_hash: str, columns=None):
+    """The fitness of a chunk of individuals, inside a worker process. The columns (durations, arrival times) of the
+    table are only sent along if the worker might not know them yet. Returns None if it doesn't, the chunk is sent
+    again with the columns then."""
+    if columns is not None:
+        worker_columns.pop(table_hash, None)
+        worker_columns[table_hash] = columns
+        while len(worker_columns) > WORKER_TABLES:
+            del worker_columns[next(iter(worker_columns))]  # The table that was sent the longest time ago.
+    columns = worker_columns.get(table_hash)
+    if columns is None:
+        return None
+    return ea_fitness(permutations, *columns)
+
+
+def ea_fitness(permutations: np.ndarray, durations: np.ndarray, arrival_times: np.ndarray) -> np.ndarray:
+    """The fitness for a batch of individuals: every individual is one row of 'permutations', the indices of its
+    processes in the order of processing. 'durations' and 'arrival_times' hold the values of every process index.
+    Returns the mean waiting time of every individual. This is a module level function so it can be sent to the worker
+    processes."""
+    waiting_times, _ = get_times(permutations, durations, arrival_times)
+    return np.mean(waiting_times, axis=-1)
+
+
+def get_times(permutations: np.ndarray, durations: np.ndarray, arrival_times: np.ndarray):
+    """Returns the waiting times and turnaround times of the processes for one order (1-D) or a batch of orders (2-D)."""
+    durations = durations[permutations]
+    arrival_times = arrival_times[permutations]
+    end_times = np.cumsum(durations, axis=-1)
+    waiting_times = end_times - arrival_times - durations
+    # a process that would end before it arrived gets a penalty: abs(waiting time - arrival time)
+    waiting_times = np.where(waiting_times < 0, np.abs(waiting_times - arrival_times), waiting_times)
+    return waiting_times, end_times - arrival_times
+
+
+def ordered_crossover(individual1, individual2, rng: random.Random):
+    """Ordered crossover on two parents, they are changed into the two offspring. A random sub section of one parent is
+    inserted into the genes of the other parent that are not in the sub section. A gene is a process index, so a
+    membership array tells in one look up if it's part of the sub section."""
+    index1 = rng.randint(0, len(individual1) - 1)
+    index2 = rng.randint(index1 + 1, len(individual1))
+
+    def make_child(parent, other_parent):
+        sub_parent = parent[index1:index2 + 1]
+        in_sub_parent = bytearray(len(parent))
+        for i in sub_parent:
+            in_sub_parent[i] = 1
+        child = [i for i in other_parent if not in_sub_parent[i]]
+        child[index1 - 1:index1 - 1] = sub_parent
+        return child
+
+    child1 = make_child(individual1, individual2)
+    child2 = make_child(individual2, individual1)
+    individual1[:] = child1
+    individual2[:] = child2
+    return individual1, individual2
+
+
+def shuffle_mutation(individual, indpb: float, rng: random.Random):
+    """Like tools.mutShuffleIndexes: every gene is swapped with another random one with the probability indpb."""
+    size = len(individual)
+    if size < 2:
+        return individual,
+    for i in range(size):
+        if rng.random() < indpb:
+            swap = rng.randint(0, size - 2)
+            if swap >= i:
+                swap += 1
+            individual[i], individual[swap] = individual[swap], individual[i]
+    return individual,
+
+
+def tournament_selection(individuals, k: int, tournsize: int, rng: random.Random):
+    """Like tools.selTournament: k times the fittest out of tournsize randomly chosen individuals."""
+    return [max((rng.choice(individuals) for _ in range(tournsize)), key=attrgetter("fitness")) for _ in range(k)]
+
+
+def clone_individual(individual):
+    """A copy of the individual and its fitness. An individual only holds integers, so no deepcopy is needed."""
+    clone = creator.Individual(individual)
+    clone.fitness.values = individual.fitness.values
+    return clone
+
+
+def setup():
+    """Imports DEAP and sets up its types and the toolbox. This only happens once, every later call returns at once."""
+    global creator, tools, toolbox
+    with setup_lock:
+        if toolbox is not None:
+            return
+        from deap import base
+        from deap import creator
+        from deap import tools
+
+        # defines the fitness class and creates an individual class, a list of process indices
+        if not hasattr(creator, "Individual"):
+            creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
+            creator.create("Individual", list, fitness=creator.FitnessMin)
+
+        # registers all operators that are needed with the toolbox
+        new_toolbox = base.Toolbox()
+        new_toolbox.register("clone", clone_individual)
+        new_toolbox.register("mate", ordered_crossover)
+        new_toolbox.register("mutate", shuffle_mutation)
+        new_toolbox.register("select", tournament_selection)
+        toolbox = new_toolbox  # only set when it is complete
+
+
+class EAResult:
+    """Everything an ea run found out."""
+    def __init__(self, best_order: List[int], best_fitness: float, best_generation: int, stats: List[float],
+                 log, stop_reason: str, evaluations: int, elapsed: float):
+        self.best_order = best_order  # The fittest order of processing that was found, as process indices.
+        self.best_fitness = best_fitness
+        self.best_generation = best_generation  # The generation the best fitness was found first.
+        self.stats = stats  # [waiting time mean, waiting median, turnaround mean, turnaround median] of the best order.
+        self.log = log  # A DEAP Logbook, per generation: gen, nevals, avg, std, min, max.
+        self.stop_reason = stop_reason  # generations, stalled, time budget or evaluation budget.
+        self.evaluations = evaluations  # Number of fitness evaluations.
+        self.elapsed = elapsed  # Wall-clock time of the run in seconds.
+
+    @property
+    def generations(self) -> int:
+        """The number of generations the run took."""
+        return self.log[-1]["gen"]
+
+
+class EvolutionaryAlgorithm:
+    def __init__(self, popsize=500, ngen=150, cxpb=0.7, mutpb=None, tnsize=3, seed=None, stall_generations=30,
+                 time_budget=None, evaluation_budget=None, resume=True, workers=None):
+        """
+        popsize, ngen, cxpb, tnsize: population size, maximum number of generations, crossover probability, tournament
+        size. mutpb is the mutation probability of an individual and of every gene, None means 1/number of processes.
+        seed: seed of the random number generator, None gives a different run every time.
+        A run stops early as soon as
+         - the best fitness has not improved for 'stall_generations' generations (None never stops for that),
+         - the next generation would exceed 'time_budget' seconds of wall-clock time in total,
+         - the next generation could exceed 'evaluation_budget' fitness evaluations in total.
+        resume: A run on the same processes as an earlier one (of any EvolutionaryAlgorithm with the same popsize)
+        continues with the population that one ended with.
+        workers: Number of worker processes that evaluate the fitness, None evaluates in the current process.
+        """
+        self.popsize = popsize
+        self.ngen = ngen
+        self.cxpb = cxpb
+        self.mutpb = mutpb
+        self.tnsize = tnsize
+        self.seed = seed
+        self.stall_generations = stall_generations
+        self.time_budget = time_budget
+        self.evaluation_budget = evaluation_budget
+        self.resume = resume
+        self.workers = workers
+
+    def get_cache_key(self, table: ProcessTable = None):
+        """Returns all parameters a run on the table depends on, or None if a run can't be repeated: without a seed or
+        with a time budget. A run that resumes depends on the population it starts with as well, so the key holds its
+        digest (None for a new population). Without a table the population is unknown, there is no key then."""
+        if self.seed is None or self.time_budget is not None or (self.resume and table is None):
+            return None
+        return (self.popsize, self.ngen, self.cxpb, self.mutpb, self.tnsize, self.seed, self.stall_generations,
+                self.evaluation_budget, self.get_previous(table)[0])
+
+    def get_previous(self, table: ProcessTable):
+        """Returns (digest, population) of the population a run on the table resumes from, (None, None) if it starts
+        with a new one."""
+        previous = populations.get(table) if self.resume else None
+        if previous is None or len(previous[1]) != self.popsize:
+            return None, None
+        return previous
+
+    def run(self, table: ProcessTable, seeds: List[List[int]] = None, progress=None, started: float = None) -> EAResult:
+        """Evolves an order of processing for the processes of the table. 'seeds' are orders (e.g. of the heuristic
+        algorithms) that replace random individuals of the first population. 'progress' is called with
+        (fraction, message) after every generation, see Scheduler.set_progress. 'started' is the time.perf_counter()
+        the time budget counts from, if the run began before this call (e.g. with computing the seeds)."""
+        run_started = time.perf_counter()
+        if started is None:
+            started = run_started
+        setup()
+        rng = random.Random(self.seed)
+        mutpb = self.mutpb if self.mutpb is not None else 1/len(table)
+
+        def evaluate(individuals):  # evaluates all individuals without a valid fitness in one batch
+            invalid = [ind for ind in individuals if not ind.fitness.valid]
+            if invalid:
+                for ind, fit in zip(invalid, self.evaluate(table, invalid)):
+                    ind.fitness.values = (fit,)
+            return len(invalid)
+
+        pop = self.initial_population(table, seeds, rng)
+
+        # keeps track of the single best solution found
+        hof = tools.HallOfFame(1)
+
+        # create a statistics object to calculate stats
+        stats = tools.Statistics(lambda ind: ind.fitness.values)
+        stats.register("avg", np.mean)
+        stats.register("std", np.std)
+        stats.register("min", np.min)
+        stats.register("max", np.max)
+
+        log = tools.Logbook()
+        log.header = ['gen', 'nevals'] + stats.fields
+
+        nevals = evaluate(pop)
+        hof.update(pop)
+        log.record(gen=0, nevals=nevals, **stats.compile(pop))
+        if progress is not None:
+            progress(0.0, f'Generation 0 of {self.ngen}, best mean waiting time: {hof[0].fitness.values[0]}')
+
+        evaluations = nevals
+        best_generation = 0
+        stop_reason = "generations"
+        generation_time = time.perf_counter() - run_started  # duration of the latest generation
+        for gen in range(1, self.ngen + 1):
+            # checks the budgets before a generation starts, so it never runs over them
+            if self.time_budget is not None and time.perf_counter() - started + generation_time > self.time_budget:
+                stop_reason = "time budget"
+                break
+            if self.evaluation_budget is not None and evaluations + len(pop) > self.evaluation_budget:
+                stop_reason = "evaluation budget"
+                break
+
+            generation_started = time.perf_counter()
+            best = hof[0].fitness.values[0]
+            offspring = toolbox.select(pop, len(pop), self.tnsize, rng)
+            offspring = self.vary(offspring, mutpb, rng)
+
+            nevals = evaluate(offspring)
+            hof.update(offspring)
+            pop[:] = offspring
+            log.record(gen=gen, nevals=nevals, **stats.compile(pop))
+            evaluations += nevals
+            generation_time = time.perf_counter() - generation_started
+            if progress is not None:
+                progress(gen / self.ngen,
+                         f'Generation {gen} of {self.ngen}, best mean waiting time: {hof[0].fitness.values[0]}')
+
+            if hof[0].fitness.values[0] < best:
+                best_generation = gen
+            elif self.stall_generations is not None and gen - best_generation >= self.stall_generations:
+                stop_reason = "stalled"  # no improvement for stall_generations generations - it has converged
+                break
+
+        if self.resume:
+            # the population is kept for the next run, together with the best individual, which could have been lost
+            kept = [toolbox.clone(hof[0])] + pop[:-1]
+            hasher = hashlib.sha256()
+            for ind in kept:  # One individual after the other, a matrix of all of them could be huge.
+                hasher.update(np.array(ind, dtype=np.int64).tobytes())
+            populations[table] = (hasher.hexdigest(), kept)
+
+        best_order = list(hof[0])
+        return EAResult(best_order, hof[0].fitness.values[0], best_generation, self.get_stats(table, best_order), log,
+                        stop_reason, evaluations, time.perf_counter() - started)
+
+    def initial_population(self, table: ProcessTable, seeds, rng: random.Random) -> list:
+        """Returns the population the run starts with."""
+        previous = self.get_previous(table)[1]
+        if previous is not None:
+            # the processes did not change since the last run, so it starts where that one stopped
+            return [toolbox.clone(ind) for ind in previous]
+
+        indices = list(range(len(table)))
+        pop = []
+        for _ in range(self.popsize):  # individuals with the process indices in a random order
+            rng.shuffle(indices)
+            pop.append(creator.Individual(indices))
+        for i, order in enumerate((seeds or [])[:self.popsize]):
+            pop[i] = creator.Individual(order)
+        return pop
+
+    def vary(self, population, mutpb: float, rng: random.Random) -> list:
+        """Like algorithms.varAnd: the offspring are clones of the population, neighbours are crossed over with the
+        probability cxpb, then every individual is mutated with the probability mutpb."""
+        offspring = [toolbox.clone(ind) for ind in population]
+        for i in range(1, len(offspring), 2):
+            if rng.random() < self.cxpb:
+                toolbox.mate(offspring[i - 1], offspring[i], rng)
+                del offspring[i - 1].fitness.values, offspring[i].fitness.values
+        for i in range(len(offspring)):
+            if rng.random() < mutpb:
+                toolbox.mutate(offspring[i], mutpb, rng)
+                del offspring[i].fitness.values
+        return offspring
+
+    def evaluate(self, table: ProcessTable, individuals) -> np.ndarray:
+        """Calculates the fitness of a whole population at once. Every individual is one row of an integer matrix, the
+        waiting times of all of them are calculated column-wise by numpy - in the worker processes, if there are any."""
+        permutations = np.array(individuals, dtype=np.int64)
+        if self.workers is None:
+            return ea_fitness(permutations, table.duration, table.arrival_time)
+        pool = get_worker_pool(self.workers)
+        try:
+            return self.evaluate_in_workers(pool, table, permutations)
+        except BrokenProcessPool:  # A worker process died - the pool is replaced and the generation evaluated again.
+            drop_worker_pool(self.workers, pool)
+            return self.evaluate_in_workers(get_worker_pool(self.workers), table, permutations)
+
+    def evaluate_in_workers(self, pool: ProcessPoolExecutor, table: ProcessTable, permutations: np.ndarray):
+        """The workers get the index matrix, split into one chunk of rows per worker, and the hash of the table. A
+        worker that doesn't know the table's columns yet gets its chunk again, with the columns - so they are sent about
+        once per worker, not with every generation."""
+        table_hash = table.get_hash()
+        chunks = np.array_split(permutations, min(self.workers, len(permutations)))
+        results = list(pool.map(worker_fitness, chunks, [table_hash] * len(chunks)))
+        missing = [i for i, result in enumerate(results) if result is None]
+        while missing:
+            columns = (table.duration, table.arrival_time)
+            for i, result in zip(missing, pool.map(worker_fitness, [chunks[i] for i in missing],
+                                                   [table_hash] * len(missing), [columns] * len(missing))):
+                results[i] = result
+            missing = [i for i in missing if results[i] is None]
+        return np.concatenate(results)
+
+    @staticmethod
+    def get_stats(table: ProcessTable, order: List[int]) -> List[float]:
+        """Returns [waiting time mean, waiting median, turnaround mean, turnaround median] of an order, calculated the
+        same way as the fitness."""
+        waiting_times, turnaround_times = get_times(np.asarray(order, dtype=np.int64), table.duration,
+                                                    table.arrival_time)
+        return [
+            np.mean(waiting_times),
+            np.median(waiting_times),
+            np.mean(turnaround_times),
+            np.median(turnaround_times)
+        ]
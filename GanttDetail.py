@@ -0,0 +1,160 @@
+"""Level of detail for the gantt chart. A long simulation has far more segments than the chart has pixels, and sending
+all of them to the browser makes the figure megabytes large and the browser slow. So between the Scheduler's data and
+the figure the segments are reduced to what can be seen in the visible time range:
+ - Segments outside of the range are left out, the ones on its border are cut.
+ - Neighbouring segments of the same row that are less than a pixel apart get merged into one bar, as long as one of
+   them is smaller than a pixel. A bar with merged segments tells how many there are and how busy the row was.
+ - If there are more rows (process names) than max_rows, the busiest ones are shown and all others share one row.
+That way a chart never has much more than 2 * width bars per row, no matter how many segments the simulation has. When
+the user zooms in, the segments are reduced again for the new range, so the details show up."""
+
+from typing import List
+
+import numpy as np
+
+from TraceSink import Segments
+
+OTHER = 'other processes'  # Name of the row that holds all processes beyond max_rows.
+START = np.datetime64('2020-01-01T00:00:00', 's')  # Time unit 0 on a chart with a date axis, a time unit is a second.
+
+
+def to_datetimes(time_units) -> np.ndarray:
+    """Turns time units into the datetime64 values of a date axis, all at once. There is no limit on the time units,
+    a simulation of more than an hour (or day) just goes on into the next hour (or day)."""
+    return START + np.asarray(time_units, dtype=np.int64).astype('timedelta64[s]')
+
+
+def format_times(time_units) -> np.ndarray:
+    """Turns time units into strings like '2020-01-01T01:02:05' for a date axis, all at once."""
+    return np.datetime_as_string(to_datetimes(time_units), unit='s')
+
+
+class Bars:
+    """The bars of a gantt chart as columns. Bar i is drawn in the row labels[row[i]] from start[i] to finish[i] (in
+    time units) and has the hover text description[i]."""
+    def __init__(self, labels: List[str], row, start, finish, description: List[str]):
+        self.labels = labels
+        self.row = row
+        self.start = start
+        self.finish = finish
+        self.description = description
+
+    def __len__(self):
+        return len(self.row)
+
+    def to_dicts(self) -> List[dict]:
+        """Returns the bars like data_plotly_formatted does: a dict for every bar, for plotly's create_gantt."""
+        return [dict(Task=self.labels[row], Start=start, Finish=finish, Description=description)
+                for row, start, finish, description in zip(self.row.tolist(), format_times(self.start).tolist(),
+                                                           format_times(self.finish).tolist(), self.description)]
+
+
+def level_of_detail(scheduler, x_range=None, width: int = 1200, max_rows: int = 40) -> List[dict]:
+    """Returns the latest simulation of the scheduler like data_plotly_formatted does, but reduced for a chart that is
+    'width' pixels wide and shows the time units x_range = (first, last), by default the whole simulation."""
+    return get_bars(scheduler, x_range, width, max_rows).to_dicts()
+
+
+def get_bars(scheduler, x_range=None, width: int = 1200, max_rows: int = 40) -> Bars:
+    """Like level_of_detail, but returns the bars as columns."""
+    rows, names, starts, finishes, arrivals = get_columns(scheduler.data, scheduler.table)
+    if len(starts) == 0:
+        return Bars([], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), [])
+    if x_range is None:
+        first, last = int(starts.min()), int(finishes.max())
+    else:  # whole time units, that contain the range
+        first, last = int(np.floor(x_range[0])), int(np.ceil(x_range[1]))
+    pixel = max(last - first, 1) / width  # Time units per pixel.
+
+    # only what's visible, cut to the range
+    visible = (finishes > first) & (starts < last)
+    rows, starts, finishes, arrivals = rows[visible], starts[visible], finishes[visible], arrivals[visible]
+    starts = np.maximum(starts, first)
+    finishes = np.minimum(finishes, last)
+
+    # the busiest rows keep their own row, all others are put together in the row 'other'
+    labels = list(names)
+    if len(set(rows.tolist())) > max_rows:
+        busy = np.bincount(rows, weights=finishes - starts, minlength=len(names))
+        kept = np.zeros(len(names), dtype=bool)
+        kept[np.argsort(-busy, kind='stable')[:max_rows - 1]] = True
+        process_rows = rows
+        rows = np.where(kept[rows], rows, len(labels))
+        labels.append(OTHER)
+    else:
+        process_rows = rows
+
+    order = np.lexsort((starts, rows))
+    rows, process_rows = rows[order], process_rows[order]
+    starts, finishes, arrivals = starts[order], finishes[order], arrivals[order]
+    bar_rows, bar_starts, bar_finishes, descriptions = [rows[:0]], [starts[:0]], [finishes[:0]], []
+    for row in np.unique(rows):
+        begin, end = np.searchsorted(rows, [row, row + 1])
+        row_starts, row_finishes, row_descriptions = merge_row(labels[row], names, process_rows[begin:end],
+                                                               starts[begin:end], finishes[begin:end],
+                                                               arrivals[begin:end], pixel)
+        bar_rows.append(np.full(len(row_starts), row, dtype=np.int64))
+        bar_starts.append(row_starts)
+        bar_finishes.append(row_finishes)
+        descriptions.extend(row_descriptions)
+    return Bars(labels, np.concatenate(bar_rows), np.concatenate(bar_starts), np.concatenate(bar_finishes),
+                descriptions)
+
+
+def merge_row(label, names, process_rows, starts, finishes, arrivals, pixel):
+    """Merges the segments of one row (sorted by start) that are closer than a pixel. Returns the starts, finishes and
+    descriptions of the bars."""
+    lengths = finishes - starts
+    small = lengths < pixel
+    latest_finish = np.maximum.accumulate(finishes)
+    gaps = starts[1:] - latest_finish[:-1]
+    merged = (gaps < pixel) & (small[1:] | small[:-1])  # The segment belongs to the bar of the one before.
+    bar_starts = np.flatnonzero(np.concatenate(([True], ~merged)))  # Position of the first segment of every bar.
+    counts = np.diff(np.append(bar_starts, len(starts)))
+    bar_finishes = np.maximum.reduceat(finishes, bar_starts)
+    bar_busy = np.add.reduceat(lengths, bar_starts)
+
+    descriptions = []
+    for first, count, finish, busy in zip(bar_starts.tolist(), counts.tolist(), bar_finishes.tolist(),
+                                          bar_busy.tolist()):
+        start = int(starts[first])
+        if count == 1:  # A single segment looks just like in data_plotly_formatted.
+            descriptions.append(f'Task: {names[process_rows[first]]} Duration: {finish - start} '
+                                f'Arrival: {arrivals[first]}')
+        else:
+            descriptions.append(f'Task: {label} {count} pieces, busy {busy} of {finish - start} time units')
+    return starts[bar_starts], bar_finishes, descriptions
+
+
+def get_columns(data, table):
+    """Returns the data of a simulation as arrays: row (name id), names, start, finish and arrival of every segment."""
+    if isinstance(data, Segments):
+        index, starts, finishes = data.get_arrays()
+        return table.name_id[index], table.names, starts, finishes, table.arrival_time[index]
+    # a list of [name, start, finish, arrival] entries, e.g. of a ListSink
+    name_ids = {}
+    rows = np.array([name_ids.setdefault(entry[0], len(name_ids)) for entry in data], dtype=np.int64)
+    columns = np.array([entry[1:4] for entry in data], dtype=np.int64).reshape(-1, 3)
+    return rows, list(name_ids), columns[:, 0], columns[:, 1], columns[:, 2]
+
+
+def parse_time(value) -> float:
+    """Turns a value of the chart's time axis back into time units: a number on a linear axis is one already, a date
+    (like '2020-01-01 00:01:05.5') is the time since START."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float((np.datetime64(str(value), 'ms') - START) / np.timedelta64(1, 's'))
+
+
+def get_x_range(relayout_data):
+    """Returns the time range (first, last) the user zoomed to, None for the whole simulation - or False if the
+    relayout did not change the time range at all."""
+    if not relayout_data:
+        return False
+    if relayout_data.get('xaxis.autorange'):
+        return None
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return parse_time(relayout_data['xaxis.range[0]']), parse_time(relayout_data['xaxis.range[1]'])
+    if 'xaxis.range' in relayout_data:
+        return tuple(parse_time(value) for value in relayout_data['xaxis.range'])
+    return False
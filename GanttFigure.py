@@ -0,0 +1,111 @@
+"""Renders the gantt chart of a Scheduler's latest simulation. plotly's figure_factory.create_gantt builds two traces per
+process and goes through a list of dicts, so it gets slow for large simulations. The WebGL renderer draws the same
+chart straight from the arrays of GanttDetail.get_bars, with two Scattergl traces per row no matter how many bars
+there are (and there are at most max_rows + 1 rows): one holds the bars of the row as rectangles (separated by gaps)
+and is its legend entry, the other one the hover texts at the start and the finish of every bar, just like
+create_gantt. Every row is a legend group of its own, so a click on a legend entry hides that row only.
+Its time axis is linear and shows the time units as numbers, they go to the browser as they are - no datetime strings
+to build and no limit on how long a simulation can be. create_gantt needs dates, it gets GanttDetail.format_times.
+Set the environment variable GANTT_RENDERER to 'figure_factory' to draw the charts with create_gantt again."""
+
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+from GanttDetail import get_bars, format_times, OTHER
+
+OTHER_COLOR = 'rgb(128, 128, 128)'  # The color of the row that holds all processes beyond max_rows.
+BAR_HEIGHT = 0.2  # Half the height of a bar, the rows are 1 apart - the same as create_gantt's bar_width.
+GANTT_RENDERER = os.environ.get('GANTT_RENDERER', 'webgl')
+
+
+def gantt_figure(scheduler, title: str, x_range=None, width: int = 1200, max_rows: int = 40):
+    """Builds the gantt chart of the latest simulation of the scheduler, for the time range x_range (first, last) or
+    the whole simulation, with the renderer set by GANTT_RENDERER."""
+    bars = get_bars(scheduler, x_range, width, max_rows)
+    colors = scheduler.get_colors()
+    colors[OTHER] = OTHER_COLOR
+    if GANTT_RENDERER == 'figure_factory':
+        fig = figure_factory_gantt(bars, colors, title)
+        if x_range is not None:
+            fig.layout.xaxis.range = format_times(np.floor(x_range)).tolist()
+    else:
+        fig = webgl_gantt(bars, colors, title)
+        if x_range is not None:
+            fig.layout.xaxis.range = list(x_range)
+    fig.layout.uirevision = title  # Keeps the zoom when the figure is replaced by the one with more details.
+    return fig
+
+
+def figure_factory_gantt(bars, colors: dict, title: str):
+    """Draws the bars with plotly's create_gantt."""
+    import plotly.figure_factory as ff  # It pulls in scipy and pandas, so it's only imported if it's used.
+    data = sorted(bars.to_dicts(), key=lambda i: i['Task'])
+    fig = ff.create_gantt(data, group_tasks=True, showgrid_x=True, title=title + " visualized:", colors=colors,
+                          index_col='Task', show_colorbar=True)
+    if len(bars) == 0 or bars.finish.max() < 3600:
+        fig.layout.xaxis.tickformat = "%Mm %Ss"  # Show minutes and Seconds as '00m 00s'
+    # a longer simulation keeps plotly's date ticks, '%Mm %Ss' would start again at 00m 00s after an hour
+    return fig
+
+
+def webgl_gantt(bars, colors: dict, title: str):
+    """Draws the bars with one Scattergl trace per row (and one for their hover texts). Looks like create_gantt: the
+    rows are sorted by name from top to bottom and the legend has an entry per row."""
+    # every row that has bars gets its position on the y axis, the first name at the top
+    shown = sorted(np.unique(bars.row).tolist(), key=lambda row: bars.labels[row])
+    position = np.zeros(len(bars.labels), dtype=np.int64)
+    position[shown] = np.arange(len(shown))[::-1]
+
+    starts = bars.start.astype(float)  # float, so the rectangles can be separated by NaN (sent as null)
+    finishes = bars.finish.astype(float)
+    descriptions = np.array(bars.description, dtype=object)
+    y = position[bars.row]
+    # the bars sorted by row, so the ones of every row are a slice
+    by_row = np.argsort(bars.row, kind='stable')
+    row_start = np.searchsorted(bars.row[by_row], np.arange(len(bars.labels) + 1))
+
+    traces = []  # Built first and handed to the figure at once, add_trace would copy all traces before every new one.
+    for row in shown[::-1]:  # In the order of the rows from top to bottom, that's the order of the legend as well.
+        label = bars.labels[row]
+        color = colors.get(label, OTHER_COLOR)
+        selected = by_row[row_start[row]:row_start[row + 1]]
+        # rows with the same color must not share a legend group, a click on the legend would hide all of them
+        traces.append(go.Scattergl(x=rectangles(starts[selected], finishes[selected]),
+                                   y=rectangles(y[selected] - BAR_HEIGHT, y[selected] + BAR_HEIGHT, vertical=True),
+                                   mode='none', fill='toself', fillcolor=color, hoverinfo='skip', name=label,
+                                   legendgroup=str(row)))
+        traces.append(go.Scattergl(x=interleave(starts[selected], finishes[selected]),
+                                   y=interleave(y[selected], y[selected]),
+                                   text=interleave(descriptions[selected], descriptions[selected]),
+                                   mode='markers', marker=dict(color=color, size=1, opacity=0), hoverinfo='text',
+                                   name='', legendgroup=str(row), showlegend=False))
+
+    fig = go.Figure(data=traces)
+    fig.update_layout(title=title + " visualized:", height=600, hovermode='closest', showlegend=True,
+                      xaxis=dict(type='linear', showgrid=True, zeroline=False, title='time units'),
+                      yaxis=dict(showgrid=False, zeroline=False, tickvals=list(range(len(shown))),
+                                 ticktext=[bars.labels[row] for row in shown[::-1]], range=[-1, len(shown) + 1],
+                                 autorange=False))
+    return fig
+
+
+def rectangles(low, high, vertical: bool = False) -> np.ndarray:
+    """Returns the corners of rectangles from low to high, followed by NaN to separate them. Horizontally that's
+    low, high, high, low - vertically low, low, high, high."""
+    corners = np.empty((len(low), 5), dtype=float)
+    corners[:, 0] = low
+    corners[:, 1] = low if vertical else high
+    corners[:, 2] = high
+    corners[:, 3] = high if vertical else low
+    corners[:, 4] = np.nan
+    return corners.ravel()
+
+
+def interleave(first, second) -> np.ndarray:
+    """Returns first[0], second[0], first[1], second[1], ..."""
+    values = np.empty((len(first), 2), dtype=object if first.dtype == object else first.dtype)
+    values[:, 0] = first
+    values[:, 1] = second
+    return values.ravel()
@@ -0,0 +1,111 @@
+"""The Job Executor runs long simulations in the background, so a request of the app doesn't have to wait for them. Every
+job gets an id, with that id its progress can be polled and its result fetched later on - or it can be cancelled.
+A job reports its progress through the function it gets as the keyword argument 'progress', e.g. the Scheduler's
+set_progress. A cancelled job stops the next time it reports its progress.
+The jobs only live inside the process that runs them. With many worker processes a poll can land at a process that
+doesn't know the job - the caller can then submit it there again under the same id (that's what the app does, with the
+job's arguments it keeps in the browser). A job that is done is forgotten once its result was fetched (see forget), or
+at the latest 'ttl' seconds after it was done, so the results don't pile up in memory."""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    """Raised inside a job as soon as it reports its progress after it was cancelled."""
+
+
+class Job:
+    def __init__(self, job_id: str = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.fraction = 0.0  # Progress from 0 to 1.
+        self.message = ''  # Description of the progress, like the best result so far.
+        self.cancelled = threading.Event()
+        self.future = None
+        self.done_at = None  # time.monotonic() when the job was done, None while it runs.
+
+    def report(self, fraction: float, message: str = ''):
+        """Called by the job itself to report its progress. Raises JobCancelled if the job should stop."""
+        self.fraction = fraction
+        self.message = message
+        if self.cancelled.is_set():
+            raise JobCancelled(self.id)
+
+    def cancel(self):
+        """Asks the job to stop. A job that did not start yet won't start at all."""
+        self.cancelled.set()
+        self.future.cancel()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Waits at most 'timeout' seconds for the job to be done. Returns True if it is done."""
+        try:
+            self.future.exception(timeout=timeout)
+        except Exception:  # Timeout, or the job was cancelled before it started.
+            pass
+        return self.future.done()
+
+    @property
+    def state(self) -> str:
+        """One of: running, done, cancelled, failed."""
+        if not self.future.done():
+            return "running"
+        if self.future.cancelled() or isinstance(self.future.exception(), JobCancelled):
+            return "cancelled"
+        if self.future.exception() is not None:
+            return "failed"
+        return "done"
+
+    def result(self):
+        """Returns what the job returned, it must be done."""
+        return self.future.result()
+
+
+class JobExecutor:
+    def __init__(self, max_workers: int = 4, max_jobs: int = 256, ttl: float = 600):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_jobs = max_jobs  # Jobs that are done are forgotten if there are more jobs than that.
+        self.ttl = ttl  # Seconds a job that is done is kept at most.
+        self.jobs = {}  # Job id -> job, in the order they were submitted.
+        self.lock = threading.Lock()
+
+    def submit(self, function, *args, job_id: str = None) -> Job:
+        """Runs function(*args, progress=job.report) in the background and returns the job. 'job_id' is the id of a job
+        that was submitted somewhere else (e.g. another worker process) and is submitted here again, None gets a new
+        one."""
+        job = Job(job_id)
+        with self.lock:
+            self.forget_done_jobs()
+            self.jobs[job.id] = job
+            job.future = self.executor.submit(function, *args, progress=job.report)
+        job.future.add_done_callback(lambda future: setattr(job, 'done_at', time.monotonic()))
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """Returns the job with the id, or None if there is no such job (anymore)."""
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str):
+        """Cancels the job with the id, if there is one - e.g. the simulation of a session that got a newer input."""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def forget(self, job_id: str):
+        """Drops the job with the id, e.g. once its result was fetched. It's not cancelled if it still runs."""
+        with self.lock:
+            self.jobs.pop(job_id, None)
+
+    def forget_done_jobs(self):
+        """Drops the jobs that are done since more than ttl seconds, then the oldest jobs that are done until there are
+        at most max_jobs left. Called while holding the lock."""
+        expired = time.monotonic() - self.ttl
+        for job_id, job in list(self.jobs.items()):
+            if job.done_at is not None and job.done_at < expired:
+                del self.jobs[job_id]
+        for job_id in list(self.jobs):
+            if len(self.jobs) < self.max_jobs:
+                break
+            if self.jobs[job_id].future.done():
+                del self.jobs[job_id]
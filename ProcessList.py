@@ -5,28 +5,39 @@ __author__ = "Anton Roesler"
 __email__ = "anton.roesler@stud.fra-uas.de"
 
 from Process import Process
+from ProcessTable import ProcessTable
+from WorkloadReader import read_chunks
 from copy import deepcopy
 
 
 class ProcessListAdministration:
     def __init__(self):
         self.processes = []
+        # Every change of the list goes through the functions below and increases the version. The table is only built
+        # again if the version has changed since it was built the last time.
+        self.version = 0
+        self.table = None
+        self.table_version = None
 
     def add(self, name: str, duration: int, arrival_time: int):
         """Builds a new process object from given args. This new process is added to the process list."""
         self.processes.append(Process(name, duration, arrival_time))
+        self.version += 1
 
     def add_process(self, process: Process):
         """Adds a given process to the process list"""
         self.processes.append(process)
+        self.version += 1
 
     def remove(self, process: Process):
         """Removes a given process."""
         self.processes.remove(process)
+        self.version += 1
 
     def clear(self):
         """Empties the process list"""
         self.processes = []
+        self.version += 1
 
     def get_process_list(self):
         """Returns a deepcopy of the process list."""
@@ -34,19 +45,24 @@ class ProcessListAdministration:
             return [Process('null', 1, 0)]  # if the list is completely empty a pseudo process will be returned.
         return deepcopy(self.processes)
 
+    def get_table(self) -> ProcessTable:
+        """Returns the process list as a ProcessTable, the columnar form the Scheduler runs against. The table can't be
+        changed, so the same one is returned as long as the process list did not change."""
+        if self.table_version != self.version:
+            if len(self.processes) == 0:
+                self.table = ProcessTable.from_processes([Process('null', 1, 0)])  # The same pseudo process as above.
+            else:
+                self.table = ProcessTable.from_processes(self.processes)
+            self.table_version = self.version
+        return self.table
+
     def read_csv(self, filepath):
         """Reads a csv file formatted as 'name, duration, arrival_time' and adds every line as a new process to the
-        process list."""
-
-
-        file = open("processes5.csv", 'r')
-        file.readline()  # Skip the first row inside csv file.
-        #file = [['a',11,0],['b',17,0],['c',3,0],['x',19,57]]
-        for line in file:
-            if not line:
-                break  # if the row is empty, the last row is reached and the for loop is done.
-            line = line.split(',')  # Separate row into its 3 parts, at the comma.
-            if len(line) >= 3:  # Only precede if all the arguments are available.
-                self.processes.append(Process(line[0], int(line[1]), int(line[2])))  # Add as a new process to the list.
-        file.close()
-
+        process list. A row that is no valid process raises a WorkloadFormatError with its line number. For files too
+        large for a list of processes, WorkloadReader.read_table builds a ProcessTable straight from the file. That's
+        also the one that uses pandas, here the rows are parsed without it (so importing the app doesn't load it)."""
+        for names, durations, arrival_times in read_chunks(filepath, use_pandas=False):
+            self.processes.extend(Process(name, duration, arrival_time)
+                                  for name, duration, arrival_time in zip(names, durations.tolist(),
+                                                                          arrival_times.tolist()))
+        self.version += 1
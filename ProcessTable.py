@@ -0,0 +1,174 @@
+"""The Process Table is a columnar alternative to a list of Process objects. Every attribute of the processes is stored in
+its own NumPy array, the position inside the arrays (the index) identifies the process. Names are stored only once in a
+name table, the processes refer to them by their name id. The Scheduler can run directly against this table, which
+needs a fraction of the memory of Process objects and lets the stats be calculated in a single vectorized pass.
+The table itself only holds what describes the processes and never changes. Everything a simulation changes lives in a
+separate RunState, so many runs (and many Schedulers) can share one table without copying it."""
+
+import hashlib
+import json
+import os
+import numpy as np
+from typing import List
+
+from Process import Process
+
+NOT_SET = -1  # Marks a starting time or end time that is not reached yet. Simulated times are never negative.
+
+
+class ProcessTable:
+    def __init__(self, names: List[str], name_id, duration, arrival_time):
+        self.names = names  # The name table, every distinct name only once.
+        self.name_id = read_only(name_id)  # Position of the process's name inside the name table.
+        self.duration = read_only(duration)
+        self.arrival_time = read_only(arrival_time)
+        self.arrival_order = None  # Indices sorted by arrival time, built when needed.
+        self.hash = None  # Hash of the content, built when needed.
+        self.path = None  # The directory the table was loaded from (see load), None if it is only in memory.
+
+    @classmethod
+    def from_columns(cls, process_names: List[str], duration, arrival_time):
+        """Builds a table from one name, duration and arrival time per process. Repeating names are stored only once."""
+        name_ids = {}  # name -> name id, in the order the names show up first.
+        name_id = [name_ids.setdefault(name, len(name_ids)) for name in process_names]
+        return cls(list(name_ids), name_id, duration, arrival_time)
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Builds a table from chunks of (process names, durations, arrival times), e.g. the ones of a file that is read
+        piece by piece. Only the columns are kept of every chunk, no Process objects are built."""
+        name_ids = {}  # name -> name id, in the order the names show up first.
+        name_id, duration, arrival_time = [], [], []
+        for process_names, chunk_duration, chunk_arrival_time in chunks:
+            name_id.append(np.fromiter((name_ids.setdefault(name, len(name_ids)) for name in process_names),
+                                       dtype=np.int64, count=len(process_names)))
+            duration.append(np.asarray(chunk_duration, dtype=np.int64))
+            arrival_time.append(np.asarray(chunk_arrival_time, dtype=np.int64))
+        if not name_id:
+            return cls([], [], [], [])
+        return cls(list(name_ids), np.concatenate(name_id), np.concatenate(duration), np.concatenate(arrival_time))
+
+    @classmethod
+    def from_processes(cls, processes: List[Process]):
+        """Builds a table from a list of Process objects."""
+        return cls.from_columns([p.name for p in processes], [p.duration for p in processes],
+                                [p.arrival_time for p in processes])
+
+    @classmethod
+    def load(cls, path, mmap: bool = True):
+        """Loads a table that was saved with save. With mmap the columns are not read, the files are mapped into memory:
+        Loading takes the same time for any number of processes, only the pages that get used are read from the disk,
+        and all processes of the machine that load the same table share them."""
+        with open(os.path.join(path, 'table.json'), 'r') as file:
+            meta = json.load(file)
+        mmap_mode = 'r' if mmap else None
+        columns = [np.load(os.path.join(path, f'{column}.npy'), mmap_mode=mmap_mode)
+                   for column in ('name_id', 'duration', 'arrival_time')]
+        table = cls(meta['names'], *columns)
+        table.hash = meta['hash']
+        table.path = path
+        return table
+
+    def save(self, path):
+        """Saves the table into the directory 'path' (it gets created if needed), in a binary format that load can map
+        into memory: every column is a .npy file, the name table and the hash are in table.json."""
+        os.makedirs(path, exist_ok=True)
+        for column in ('name_id', 'duration', 'arrival_time'):
+            np.save(os.path.join(path, f'{column}.npy'), getattr(self, column))
+        with open(os.path.join(path, 'table.json'), 'w') as file:
+            json.dump({'names': self.names, 'hash': self.get_hash()}, file)
+
+    def __reduce__(self):
+        """A loaded table is sent to other processes (e.g. a ProcessPoolExecutor) as its path, so they map the same
+        files instead of getting a copy of the columns."""
+        if self.path is not None:
+            return ProcessTable.load, (self.path,)
+        return ProcessTable, (self.names, self.name_id, self.duration, self.arrival_time)
+
+    def __len__(self):
+        return len(self.duration)
+
+    def get_table(self):
+        """A table can be used by the Scheduler in place of a ProcessListAdministration."""
+        return self
+
+    def new_state(self):
+        """Returns a fresh RunState for a new simulation of these processes."""
+        return RunState(self)
+
+    def get_arrival_order(self) -> List[int]:
+        """Returns the indices of all processes in the order of their arrival time, equal arrival times in the order of
+        the table. The list is shared by all runs and must not be changed."""
+        if self.arrival_order is None:
+            self.arrival_order = np.argsort(self.arrival_time, kind='stable').tolist()
+        return self.arrival_order
+
+    def get_hash(self) -> str:
+        """Returns a hash of the processes. Two tables with the same processes in the same order have the same hash, no
+        matter where they came from, so it identifies the workload of a simulation (e.g. in the ResultCache)."""
+        if self.hash is None:
+            content = hashlib.sha256(repr(self.names).encode())
+            for column in (self.name_id, self.duration, self.arrival_time):
+                content.update(np.ascontiguousarray(column).tobytes())
+            self.hash = content.hexdigest()
+        return self.hash
+
+    def get_name(self, index: int) -> str:
+        return self.names[self.name_id[index]]
+
+    def get_response_ratio(self, index: int, passed_time: int) -> float:
+        """Calculates and returns the response ratio, exactly like Process.get_response_ratio."""
+        waiting_time = passed_time - int(self.arrival_time[index])
+        duration = int(self.duration[index])
+        return (waiting_time+duration)/duration
+
+
+class RunState:
+    """The state of one simulation of a ProcessTable, the same as the changing attributes of a Process object."""
+    def __init__(self, table: ProcessTable):
+        self.table = table
+        self.remaining_time = np.array(table.duration, dtype=np.int64)  # A writable copy.
+        self.starting_time = np.full(len(table), NOT_SET, dtype=np.int64)
+        self.end_time = np.full(len(table), NOT_SET, dtype=np.int64)
+
+    def finished(self, index: int) -> bool:
+        """A process with a remaining time of 0 is considered finished."""
+        return self.remaining_time[index] <= 0
+
+    def process(self, index: int, time_units: int, current_time: int):
+        """Simulates that the process gets processed 'time_units' time units. If it is finished with this step, the end
+        time gets set."""
+        self.remaining_time[index] -= time_units
+        if self.remaining_time[index] <= 0:
+            self.end_time[index] = current_time
+
+    def get_waiting_times(self) -> np.ndarray:
+        """The waiting times of all processes, the total turnaround time minus the duration."""
+        return self.end_time - self.table.arrival_time - self.table.duration
+
+    def get_turnaround_times(self) -> np.ndarray:
+        """The turnaround times of all processes, the end time minus the arrival time."""
+        return self.end_time - self.table.arrival_time
+
+    def get_process(self, index: int) -> Process:
+        """Builds a Process object with the current state of the process."""
+        table = self.table
+        process = Process(table.get_name(index), int(table.duration[index]), int(table.arrival_time[index]))
+        process.remaining_time = int(self.remaining_time[index])
+        if self.starting_time[index] != NOT_SET:
+            process.starting_time = int(self.starting_time[index])
+        if self.end_time[index] != NOT_SET:
+            process.end_time = int(self.end_time[index])
+        return process
+
+    def to_processes(self) -> List[Process]:
+        """Builds a list of Process objects with the current state of all processes."""
+        return [self.get_process(i) for i in range(len(self.table))]
+
+
+def read_only(values) -> np.ndarray:
+    """Returns the values as an int64 array that can't be written to. Arrays that are int64 already are not copied, only
+    a read-only view is put on them."""
+    array = np.asarray(values, dtype=np.int64).view()
+    array.setflags(write=False)
+    return array
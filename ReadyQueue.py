@@ -0,0 +1,213 @@
+"""The ready queues hold the processes that are competing to be processed. The Scheduler only stores the position of a
+process inside its process table (the index) in here. Equal keys are always served in the order of the process list,
+which is the same order a stable sort of the competing processes would give."""
+
+import heapq
+from collections import deque
+
+NEVER = float('inf')  # The time a winner of the ResponseRatioQueue expires, if it can't be overtaken.
+
+
+class ReadyQueue:
+    """A heap of process indices. The process with the smallest key is served first. Entries that get replaced or
+    discarded are not searched for inside the heap, they are only marked as invalid and skipped as soon as they reach the
+    top (lazy deletion)."""
+    def __init__(self):
+        self.heap = []  # Entries as (key, index), including invalid ones.
+        self.keys = {}  # The currently valid key for every index inside the queue.
+
+    def __len__(self):
+        return len(self.keys)
+
+    def push(self, index: int, key):
+        """Adds the process with the given index. If it is already inside the queue its key gets replaced."""
+        self.keys[index] = key
+        heapq.heappush(self.heap, (key, index))
+
+    def discard(self, index: int):
+        """Removes the process with the given index, if it is inside the queue."""
+        self.keys.pop(index, None)
+
+    def peek(self):
+        """Returns (key, index) of the next process without removing it, or None if the queue is empty."""
+        self.drop_invalid()
+        if not self.heap:
+            return None
+        return self.heap[0]
+
+    def pop(self) -> int:
+        """Removes the next process from the queue and returns its index."""
+        self.drop_invalid()
+        key, index = heapq.heappop(self.heap)
+        del self.keys[index]
+        return index
+
+    def drop_invalid(self):
+        """Pops entries from the top of the heap until the top one is valid."""
+        while self.heap:
+            key, index = self.heap[0]
+            if index in self.keys and self.keys[index] == key:
+                break
+            heapq.heappop(self.heap)
+
+
+class ResponseRatioQueue:
+    """Ready queue for hrrn. The response ratio (waiting time + duration) / duration changes with every time unit, so the
+    order of the waiting processes changes over time as well. But among processes with the same duration the order stays
+    the same: the ratio only depends on how long they have been waiting, so it only depends on the arrival time.
+    That's why the processes are grouped by duration, every group is a heap and only its top process competes with the
+    other groups.
+    The ratio of a process is a line over the time: 1 + (time - arrival time) / duration, and the time only moves
+    forward. So the groups compete in a kinetic tournament: a binary tree with a leaf per waiting duration, every node knows
+    which of the top processes below it has the smallest ratio at the current time, and from when on that is no longer
+    sure (the time the lines of the two winners below it cross). When the time moves forward, only the nodes whose
+    winner could have changed are decided again. A new top process of a group decides the nodes on its path to the root
+    again. That's O(log D) for D different durations, and all the crossings add O(log D) per process on average - so
+    hrrn takes O(n log^2 D) at worst instead of O(n D) for looking at every group.
+    The ratios are compared exactly, as fractions of integers. Equal ratios go to the smaller index."""
+    def __init__(self):
+        self.groups = {}  # duration -> heap of (-arrival_time, index), the latest arrival has the smallest ratio.
+        self.leaf = {}  # duration -> its leaf inside the tree, counted from the first leaf.
+        self.free = []  # Leaves of groups that got empty, for the next new duration.
+        self.leaves = 1  # Number of leaves of the tree, a power of 2. It doubles when they are all in use.
+        self.winner = [-1, -1]  # Node -> index of the top process with the smallest ratio below it, -1 for none.
+        self.expires = [NEVER, NEVER]  # Node -> the time from which its winner could be another one.
+        self.free.append(0)
+        self.winner_duration = [0, 0]  # Node -> duration and arrival time of its winner.
+        self.winner_arrival = [0, 0]
+        self.time = 0  # The time the winners are decided for.
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, index: int, duration: int, arrival_time: int):
+        """Adds the process with the given index."""
+        group = self.groups.get(duration)
+        if group is None:
+            group = self.groups[duration] = []
+            if not self.free:
+                self.grow()
+            self.leaf[duration] = self.free.pop()
+        heapq.heappush(group, (-arrival_time, index))
+        self.set_top(duration)
+        self.size += 1
+
+    def pop(self, table, passed_time: int) -> int:
+        """Removes the process that is next at passed_time and returns its index. Just like the sort by response ratio
+        in the Scheduler did, that is the process with the smallest response ratio. 'table' is the ProcessTable the
+        indices point into, the queue keeps the durations and arrival times it needs itself."""
+        if passed_time > self.time:
+            self.time = passed_time
+            self.refresh(1)
+        index = self.winner[1]
+        duration = self.winner_duration[1]
+        group = self.groups[duration]
+        heapq.heappop(group)
+        self.set_top(duration)
+        if not group:  # The leaf is free for another duration.
+            del self.groups[duration]
+            self.free.append(self.leaf.pop(duration))
+        self.size -= 1
+        return index
+
+    def set_top(self, duration: int):
+        """Puts the top process of the group into its leaf, if it changed, and decides the nodes above it again. That
+        stops at the first node that keeps its winner and expiry time, the ones above it can't change then."""
+        group = self.groups[duration]
+        top = group[0][1] if group else -1
+        node = self.leaves + self.leaf[duration]
+        if self.winner[node] == top:
+            return
+        self.winner[node] = top
+        self.winner_duration[node] = duration
+        self.winner_arrival[node] = -group[0][0] if group else 0
+        node //= 2
+        while node:
+            before = self.winner[node], self.expires[node]
+            self.decide(node)
+            if (self.winner[node], self.expires[node]) == before:
+                break
+            node //= 2
+
+    def grow(self):
+        """Doubles the number of leaves (all of them are in use) and decides every node again."""
+        tops = self.winner[self.leaves:], self.winner_duration[self.leaves:], self.winner_arrival[self.leaves:]
+        self.free.extend(range(2 * self.leaves - 1, self.leaves - 1, -1))  # The new leaves, the first one is used next.
+        self.leaves *= 2
+        padding = [-1] * (self.leaves // 2)
+        self.winner = [-1] * self.leaves + tops[0] + padding
+        self.winner_duration = [0] * self.leaves + tops[1] + padding
+        self.winner_arrival = [0] * self.leaves + tops[2] + padding
+        self.expires = [NEVER] * (2 * self.leaves)
+        for node in range(self.leaves - 1, 0, -1):
+            self.decide(node)
+
+    def refresh(self, node: int):
+        """Decides every node below (and including) this one again, whose winner could have changed by now."""
+        if self.expires[node] > self.time:
+            return
+        if node < self.leaves:
+            self.refresh(2 * node)
+            self.refresh(2 * node + 1)
+            self.decide(node)
+
+    def decide(self, node: int):
+        """Picks the winner of the node from the winners of its two children at the current time, and finds out when
+        that has to be done again: as soon as one of the children changes, or the two lines cross."""
+        winner, expires, durations, arrival_times = self.winner, self.expires, self.winner_duration, self.winner_arrival
+        left = 2 * node
+        right = left + 1
+        first, second = winner[left], winner[right]
+        e1, e2 = expires[left], expires[right]
+        expiry = e1 if e1 < e2 else e2
+        if first == -1 or second == -1:
+            child = right if first == -1 else left
+            winner[node] = winner[child]
+            durations[node] = durations[child]
+            arrival_times[node] = arrival_times[child]
+            expires[node] = expiry
+            return
+        d1, d2 = durations[left], durations[right]
+        a1, a2 = arrival_times[left], arrival_times[right]
+        # ratio1 < ratio2  <=>  (time - a1 + d1) * d2 < (time - a2 + d2) * d1, all integers
+        r1, r2 = (self.time - a1 + d1) * d2, (self.time - a2 + d2) * d1
+        if r2 < r1 or (r2 == r1 and second < first):
+            first, second, d1, d2, a1, a2 = second, first, d2, d1, a2, a1
+        winner[node] = first
+        durations[node] = d1
+        arrival_times[node] = a1
+        if d1 < d2:  # The winner's ratio grows faster, the lines cross at time (a1*d2 - a2*d1) / (d2 - d1).
+            crossing, remainder = divmod(a1 * d2 - a2 * d1, d2 - d1)
+            if first < second or remainder:  # At the crossing itself a tie goes to the smaller index.
+                crossing += 1
+            if crossing < expiry:
+                expiry = crossing
+        expires[node] = expiry
+
+
+class RoundRobinQueue:
+    """Ready queue for round robin. The jobs take turns in the order of their arrival, one time slice each. A job that
+    arrives during a turn still gets its time slice in the same turn, after the jobs that were already waiting. A job that
+    had its time slice (and is not finished) waits for the next turn. Both kinds of waiting jobs are kept in a deque, so
+    adding, removing and starting a new turn is always O(1)."""
+    def __init__(self):
+        self.turn = deque()  # Jobs that still get their time slice in the current turn.
+        self.next_turn = deque()  # Jobs that already had their time slice in the current turn.
+
+    def __len__(self):
+        return len(self.turn) + len(self.next_turn)
+
+    def push(self, index: int):
+        """Adds a job that just arrived."""
+        self.turn.append(index)
+
+    def requeue(self, index: int):
+        """Adds a job that just had its time slice."""
+        self.next_turn.append(index)
+
+    def pop(self) -> int:
+        """Removes the job that gets the next time slice and returns its index."""
+        if not self.turn:  # Every job had its time slice, so a new turn starts.
+            self.turn, self.next_turn = self.next_turn, self.turn
+        return self.turn.popleft()
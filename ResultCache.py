@@ -0,0 +1,76 @@
+"""The Result Cache keeps the results of the latest simulations, so the same simulation doesn't have to run again. A result
+is found by a key that holds everything the result depends on: the hash of the processes (see ProcessTable.get_hash),
+the algorithm and its parameters. If there are more results than fit into the cache, the one that was used the longest
+time ago is dropped (least recently used). A cache can be shared by Schedulers in many threads."""
+
+import threading
+from collections import OrderedDict
+
+
+class CachedResult:
+    """Everything a Scheduler keeps about a simulation. The objects are shared with the Scheduler that ran it and must
+    not be changed - a new simulation always builds new ones."""
+    def __init__(self, data, stats, state, ea_result=None):
+        self.data = data
+        self.stats = stats
+        self.state = state
+        self.ea_result = ea_result
+        self.figures = {}  # Name of the figure -> rendered plotly figure of this result.
+
+
+class ResultCache:
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize  # Number of results that are kept at most.
+        self.results = OrderedDict()  # Key -> result, the most recently used one at the end.
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # Every change of the results (and counters) happens while holding the lock.
+
+    def __len__(self):
+        return len(self.results)
+
+    def get(self, key):
+        """Returns the result for the key, or None if it's not in the cache."""
+        with self.lock:
+            result = self.results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.results.move_to_end(key)
+            return result
+
+    def put(self, key, result):
+        """Adds the result for the key and drops the least recently used results that don't fit anymore."""
+        with self.lock:
+            self.results[key] = result
+            self.results.move_to_end(key)
+            while len(self.results) > self.maxsize:
+                self.results.popitem(last=False)
+
+    def get_figure(self, key, name: str, build):
+        """Returns the figure with the given name of the result for the key. It is built by calling build() only if it
+        isn't cached yet. A key of None means the result can't be cached, then the figure is always built. The figure is
+        built without holding the lock, so two threads could build it at the same time - both figures are the same."""
+        with self.lock:
+            result = self.results.get(key) if key is not None else None
+            figure = result.figures.get(name) if result is not None else None
+            if figure is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.results.move_to_end(key)
+                return figure
+        figure = build()
+        if result is not None:
+            result.figures[name] = figure
+        return figure
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.results), "maxsize": self.maxsize}
@@ -4,7 +4,7 @@ Important information: The time inside the Simulation is simply expressed by int
 time unit 0. If a process has a arrival time of 42, it will show up inside the Simulation as soon as passed time has
 reached a value of 42. For the plotly gantt chart a time has to have a proper datetime. For that I chose to set the
 start time as 2020-01-01 00:00:00 - it doesnt really matter. A simulation's time unit is transformed into 1 second
-for the gantt chart. It can be changed to milliseconds, minutes or whatever in line ToDo
+for the gantt chart (see GanttDetail.START), the WebGL chart shows the time units themselves on a linear axis.
 """
 
 __author__ = "Anton Roesler"
@@ -16,35 +16,90 @@ Email - 40343879@live.napier.ac.uk
 """
 
 
+import functools
+import time
+
 import numpy as np
-from deap.tools import cxOrdered
 
 from ProcessList import ProcessListAdministration
 from Process import Process
-from typing import List
-
-import matplotlib
-import matplotlib.pyplot as plt
-import pandas as pd
-from deap import algorithms
-from deap import base
-from deap import creator
-from deap import tools
-import random
-from scipy.stats import mannwhitneyu
-from scipy.stats import ttest_ind
-from scipy.stats import shapiro
+from ProcessTable import ProcessTable, RunState, NOT_SET
+from ReadyQueue import ReadyQueue, ResponseRatioQueue, RoundRobinQueue
+from EvolutionaryAlgorithm import EvolutionaryAlgorithm, EAResult
+from ResultCache import ResultCache, CachedResult
+from TraceSink import TraceSink, SegmentSink, ListSink, NullSink
+from GanttDetail import get_columns, format_times
+from typing import List, Union
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+
+COLORS = [  # The colors of the processes in the gantt chart.
+    'rgb(181, 18, 80)',
+    'rgb(219, 202, 13)',
+    'rgb(23, 18, 181)',
+    'rgb(62, 161, 16)',
+    'rgb(150, 35, 35)',
+    'rgb(18, 127, 181)',
+    'rgb(227, 112, 18)',
+    'rgb(110, 18, 181)',
+    'rgb(33, 219, 185)',
+    'rgb(181, 18, 170)',
+    'rgb(33, 219, 92)'
+]
+ALGORITHMS = ("fcfs", "sjf", "hrrn", "srtf", "lrtf", "rr", "ea")  # Short names of all scheduling algorithms.
+SEEDING_SHARE = 0.5  # The part of the ea's time budget the heuristic seeds may take, the rest is left for evolving.
+
+
+class OutOfTime(Exception):
+    """Stops a simulation that has to be done by a deadline, see get_heuristic_orders."""
+
+
+def run_algorithm(table: ProcessTable, algorithm: str, quantum: int = 3, ea_engine: EvolutionaryAlgorithm = None):
+    """Runs one algorithm on a Scheduler of its own and returns the stats. This is a module level function so it can be
+    sent to worker processes as well."""
+    scheduler = Scheduler(table)
+    scheduler.set_trace_sink(NullSink)  # Only the stats are sent back.
+    scheduler.set_quantum(quantum)
+    if ea_engine is not None:
+        scheduler.set_ea_engine(ea_engine)
+    return scheduler.run(algorithm)
+
+
+def closes_sink(algorithm):
+    """Decorates a scheduling algorithm, so the trace sink of its run gets closed once it's done - even if the run fails
+    or gets cancelled (e.g. by JobCancelled from the progress callback), a FileSink's file must not stay open."""
+    @functools.wraps(algorithm)
+    def run_and_close(self, *args, **kwargs):
+        try:
+            return algorithm(self, *args, **kwargs)
+        finally:
+            self.sink.close()
+    return run_and_close
 
 
 class Scheduler:
-    def __init__(self, process_list_admin: ProcessListAdministration):
-        self.process_list_admin = process_list_admin
-        self.process_list: List[Process] = None
+    def __init__(self, process_list_admin: Union[ProcessListAdministration, ProcessTable]):
+        self.process_list_admin = process_list_admin  # Anything that provides a ProcessTable through get_table().
+        self.table: ProcessTable = None  # The processes the simulation runs against, shared and never changed.
+        self.state: RunState = None  # Everything the simulation changes about the processes.
+        self.processes: List[Process] = None  # The table as Process objects, only built when needed.
         self.passed_time = 0  # Number of time units passed since the simulation's start, only integer values.
-        self.data = []  # Data for the diagram
+        self.trace_sink = SegmentSink  # Makes the sink for the segments of every run, see set_trace_sink.
+        self.sink: TraceSink = SegmentSink()  # Receives the segments of the current run, the data for the diagram.
         self.stats = []
         self.eastats = []
         self.quantum = 3  # Quantum is the length of the time slice for the Round Robin scheduling.
+        self.ea_engine = EvolutionaryAlgorithm()  # Runs the ea scheduling method, its parameters can be changed.
+        self.ea_result: EAResult = None  # Everything about the latest ea run: best order, log, why it stopped...
+        self.cache: ResultCache = None  # Results of earlier runs (see set_cache), None means every run is simulated.
+        self.cache_key = None  # Key of the latest result of run or run_all, None if it can't be cached.
+        self.arrivals: List[int] = []  # Indices of the process table, sorted by arrival time.
+        self.next_arrival = 0  # Position in arrivals of the next process that has not shown up yet.
+        self.unfinished = 0  # Number of processes inside the process table that are not finished.
+        self.row_start_time = None  # Start of the current row of the latest job (needed for the preemtives).
+        self.row = 0  # Number of time units the latest job was processed continuously.
+        self.progress = None  # Gets called with (fraction, message) while a simulation runs, see set_progress.
+        self.progress_step = 1  # The progress is reported every time this many processes have finished.
 
         # The start time is considered 0.
         self.start = 0  # other option: datetime.datetime.now()
@@ -52,14 +107,38 @@ class Scheduler:
     # GENERAL FUNCTIONS
     def reset(self):
         self.passed_time = 0
-        self.data = []
+        self.sink = self.trace_sink()
         self.update_process_list()
+        # Only the state of a run is new, the table is shared with every earlier run of the same processes.
+        self.state = self.table.new_state()
+        self.processes = None
+        # Processes show up in the order of their arrival time, equal arrival times in the order of the process list.
+        self.arrivals = self.table.get_arrival_order()
+        self.next_arrival = 0
+        self.unfinished = int(np.count_nonzero(self.state.remaining_time > 0))
+        self.row_start_time = None
+        self.row = 0
+        self.progress_step = max(1, len(self.table) // 100)
 
     def update_process_list(self):
-        """Sets the process list."""
-        self.process_list = self.process_list_admin.get_process_list()
+        """Sets the process table. As long as the processes did not change, this is the same table as before and the
+        state of the latest run is kept."""
+        table = self.process_list_admin.get_table()
+        if table is not self.table:
+            self.table = table
+            self.state = table.new_state()
+            self.processes = None
+
+    @property
+    def process_list(self) -> List[Process]:
+        """The processes as Process objects with the state of the latest simulation. They are built from the table the
+        first time they are needed."""
+        if self.processes is None:
+            self.processes = self.state.to_processes()
+        return self.processes
 
     #  SCHEDULING ALGORITHMS
+    @closes_sink
     def non_preemtive_algorithms(self, sjf=False, hrrn=False):
         """
         This is the Algorithm for:
@@ -69,442 +148,251 @@ class Scheduler:
         The Default is set FCFS. SJF or HRRN can be used by setting the sjf or hrrn argument to True.
         """
         self.reset()
+        # The competing processes wait inside a ready queue, ordered by arrival time (fcfs), remaining time (sjf) or
+        # grouped by duration for the response ratio (hrrn), which changes with time.
+        ready = ResponseRatioQueue() if hrrn else ReadyQueue()
+        table = self.table
+        state = self.state
         while not self.check_if_done():  # check if there are still unfinished processes inside the process list.
-
-            possible_jobs = self.get_competing_processes()  # All process that are competing to be processed.
-            if sjf:  # If the user wants to use SJF:
-                possible_jobs.sort(key=lambda x: x.remaining_time)  # Jobs get sorted by remaining time.
-            elif hrrn:  # If the user wants to use HRRN:
-                # Jobs get sorted by response ratio:
-                possible_jobs.sort(key=lambda x: x.get_response_ratio(passed_time=self.passed_time))
-            else:  # Default is FCFS:
-                possible_jobs.sort(key=lambda x: x.arrival_time)  # Jobs get sorted by arrival time.
-
-            self.process(possible_jobs[0])  # The first process in the list is the one to be done.
+            for index in self.arrived_processes():  # Every process that has arrived by now joins the competing ones.
+                if sjf:  # If the user wants to use SJF:
+                    ready.push(index, int(state.remaining_time[index]))  # Jobs get ordered by remaining time.
+                elif hrrn:  # If the user wants to use HRRN:
+                    # Jobs get ordered by response ratio:
+                    ready.push(index, int(table.duration[index]), int(table.arrival_time[index]))
+                else:  # Default is FCFS:
+                    ready.push(index, int(table.arrival_time[index]))  # Jobs get ordered by arrival time.
+            if not ready:
+                self.skip_idle_time()
+                continue
+
+            if hrrn:
+                index = ready.pop(table, self.passed_time)
+            else:
+                index = ready.pop()
+            self.process(index)  # The first process in the queue is the one to be done.
         self.stats = self.get_stats()
 
+    @closes_sink
     def remaining_time_first(self, longest=False):
         """
         This can either be Longest or Shortest remaining time first. The default is Shortest, by setting longest to true
         it will switch to the Scheduling Algorithm Longest remaining time first.
         The longest/shortest job starts first, if a longer/shorter job comes in, the longer/shorter one will be finished
         first.
+        The simulation is event driven: Instead of stepping one time unit at a time, the current job is charged the
+        whole run until the next event (an arrival, its completion or - for lrtf only - the moment another job's
+        remaining time overtakes it). Between those events the choice of job can not change.
          """
         self.reset()
+        # Default is longest=False - if longest=True, the remaining times go into the queue negated, so the longest
+        # remaining time will be at the top. Ties are broken by the position in the process list, just like the stable
+        # sort of the competing processes would do.
+        sign = -1 if longest else 1
+        ready = ReadyQueue()  # Keyed by sign * remaining time, holds all processes that are competing to be processed.
+        state = self.state
         latest_job = None  # The latest job is always the job that was processed in the last step - at beginning: None.
         while not self.check_if_done():  # Check if there are still jobs not done.
-            possible_jobs = self.get_competing_processes()  # get the list of competing jobs at this time point.
-
-            # Default is longest=False - if longest=True, the list will be sorted reverse!
-            possible_jobs.sort(key=lambda x: x.remaining_time, reverse=longest)
-            # Reverse means descending - so the longest remaining time will be at the first position in list.
-            # The jobs with the shortest/longest remaining time left, is the first one in list.
-            current_job = possible_jobs[0]
-
-            self.process_one_step(current_job, latest_job)  # The job is processed here.
+            for index in self.arrived_processes():  # Every process that has arrived by now joins the competing ones.
+                ready.push(index, sign * int(state.remaining_time[index]))
+            if not ready:
+                self.skip_idle_time()
+                continue
+
+            current_job = ready.pop()
+            remaining_time = int(state.remaining_time[current_job])
+
+            run = remaining_time  # At most the job runs until it is finished,
+            next_arrival_time = self.get_next_arrival_time()
+            if next_arrival_time is not None:  # but a new arrival could take the processor from it.
+                run = min(run, next_arrival_time - self.passed_time)
+            if longest and ready:
+                # With lrtf the job only keeps the processor as long as its remaining time is longer than the one of
+                # the runner-up - or equally long, if it comes first in the process list.
+                other_key, other_index = ready.peek()
+                run = min(run, remaining_time + other_key + (1 if current_job < other_index else 0))
+
+            self.process_run(current_job, latest_job, run)  # The job is processed here.
 
             latest_job = current_job  # Now the job that was just processed is the (new) latest job.
+            if not state.finished(current_job):
+                ready.push(current_job, sign * int(state.remaining_time[current_job]))
 
         # The last process's data doesnt get added to the data table inside the functions, because this happens in the
         # next step. And there is no next step for the last one, So it happens here:
-        self.add_data(latest_job, latest_job.row_start_time, latest_job.row)
+        self.add_data(latest_job, self.row_start_time, self.row)
         self.stats = self.get_stats()
 
+    @closes_sink
     def round_robin(self):
-        """Round Robin Scheduling Algorithm"""
+        """Round Robin Scheduling Algorithm. The jobs take turns in the order of their arrival, every turn a job gets
+        processed for at most one quantum."""
         self.reset()
-        already_processed = []
+        ready = RoundRobinQueue()
+        state = self.state
         while not self.check_if_done():  # Check if there are still jobs not done.
-            possible_jobs = self.get_competing_processes()  # Get the list of competing jobs at this time point.
-            possible_jobs.sort(key=lambda x: x.arrival_time)  # Sort by arrival time.
-            current_job = None
-            for i in range(len(possible_jobs)):       # Check for every possible job
-                current_job = possible_jobs[i]
-                if current_job in already_processed:  # if this jobs was already processed
-                    current_job = None  # if it was, current jib is set back to none.
-                else:  # if it wasn't then break out of loop an continue with this job as the current one.
-                    break
-            if not current_job:  # If every possible job was already processed then start with the beginning and reset:
-                current_job = possible_jobs[0]
-                already_processed = []  # Empty the list to start over again.
+            for index in self.arrived_processes():  # New jobs join the current turn.
+                ready.push(index)
+            if not ready:
+                self.skip_idle_time()
+                continue
+            current_job = ready.pop()
+            remaining_time = int(state.remaining_time[current_job])
 
             duration = self.quantum  # If duration gets changed, quantum should stay the same for next iteration.
-            if current_job.remaining_time < duration:  # If the jobs remaining time is less than the quantum
-                duration = current_job.remaining_time  # the time slice for the processing gets shortened to that time.
+            if not ready:
+                # If it is the only job that is ready, it gets one quantum after the other until the next job shows up.
+                # All of these quanta are processed at once and end up as one entry in the data table.
+                next_arrival_time = self.get_next_arrival_time()
+                if next_arrival_time is None:
+                    duration = remaining_time
+                else:
+                    duration = self.quantum * -(-(next_arrival_time - self.passed_time) // self.quantum)
+            if remaining_time < duration:  # If the jobs remaining time is less than the quantum
+                duration = remaining_time  # the time slice for the processing gets shortened to that time.
 
-            if current_job.starting_time is None:  # If this is the first step of processing for the current job...
-                current_job.starting_time = self.passed_time  # ...the starting time is set.
+            if state.starting_time[current_job] == NOT_SET:  # If this is the first step of processing for the job...
+                state.starting_time[current_job] = self.passed_time  # ...the starting time is set.
 
             self.add_data(current_job, self.passed_time, duration)  # Add the data to the data table
             self.passed_time += duration  # Increase the passed time
-            current_job.process(duration, self.passed_time)  # Adjust the parameter inside the job itself.
-            already_processed.append(current_job)  # Ad the job to the list of processed ones.
+            state.process(current_job, duration, self.passed_time)  # Adjust the parameter inside the job itself.
+            self.count_if_finished(current_job)
+            if not state.finished(current_job):
+                ready.requeue(current_job)  # The job waits for its next turn.
         self.stats = self.get_stats()
 
     """
     Function for additional scheduling method - evolutionary algorithm
     """
 
-    def ea(self):
+    @closes_sink
+    def ea(self, seed_heuristics=True):
+        """Evolutionary algorithm scheduling method. The search itself is done by the scheduler's EvolutionaryAlgorithm
+        (see set_ea_engine), which keeps everything about the latest run in ea_result. With 'seed_heuristics' the
+        orders of fcfs, sjf and hrrn are part of the first population."""
 
         self.reset()
-
-        process_list = self.process_list
-
-        def myInitialisationFunction(icls):  # returns an individual with a list of process in a random order
-
-            random.shuffle(process_list)
-            ind = icls(process_list)
-
-            return ind
-
-        for i in range(len(process_list)):
-            # defines the fitness class and create an individual class
-            creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
-            creator.create("Individual", list, fitness=creator.FitnessMin)
-
-            # creates a toolbox
-            toolbox = base.Toolbox()
-
-            # an individual consists of a process list
-            toolbox.register("individual", myInitialisationFunction, creator.Individual)
-
-            #  a population consists of a list of individuals
-            toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-
-        def fitnessFunc(individual):  # calculates the mean difference in preferred start time and actual start time
-            # to evaluate the individual
-            waiting_times = []
-            turnaround_times = []
-            endtime = 0
-
-            for i in individual:
-                endtime += i.duration
-                waitingTime = endtime - i.arrival_time - i.duration
-
-                if waitingTime < 0:
-                    waitingTime = abs(waitingTime - i.arrival_time)
-                    waiting_times.append(waitingTime)
-                else:
-                    waiting_times.append(waitingTime)
-
-                turnaround_times.append(endtime - i.arrival_time)
-
-            meanWaitingTime = np.mean(waiting_times)
-            medianWaitingTime = np.median(waiting_times)
-            meanTurnaroundTime = np.mean(turnaround_times)
-            medianTurnaroundTime = np.median(turnaround_times)
-
-            return meanWaitingTime,
-
-        def orderedOneXOver(individual1, individual2):  # ordered crossover on two parents and returns two offspring
-
-            # get two random indices in the parents
-            index1 = random.randint(0, len(individual1) - 1)
-            index2 = random.randint(index1 + 1, len(individual1))
-
-            # takes subsection from one parent
-            subParent1 = individual1[index1:index2 + 1]
-            tempList1 = []
-
-            # loops through the other parent and extracts the genes in order that are not in the previous sub section
-            for i in individual2:
-                contains = 0
-                for j in subParent1:
-                    if i.name == j.name:
-                        contains = 1
-                        pass
-                if contains == 0:
-                    tempList1.append(i)
-
-            child1 = tempList1
-
-            # inserts the subsection into the correct position of the new offspring
-            child1[index1-1:index1-1] = subParent1
-
-            # takes subsection from one parent
-            subParent2 = individual2[index1:index2 + 1]
-            tempList2 = []
-
-            # loops through the other parent and extracts the genes in order that are not in the previous sub section
-            for i in individual1:
-                contains = 0
-                for j in subParent2:
-                    if i.name == j.name:
-                        contains = 1
-                        pass
-                if contains == 0:
-                    tempList2.append(i)
-
-            child2 = tempList2
-            # inserts the subsection into the correct position of the new offspring
-            child2[index1 - 1:index1 - 1] = subParent2
-
-            # swaps the new crossed over process lists with the ol parent lists within the individual objects
-            childIndividual1 = individual1
-            j = 0
-            for i in child1:
-                childIndividual1[j] = i
-                j += 1
-
-            childIndividual2 = individual2
-            j = 0
-            for i in child2:
-                childIndividual2[j] = i
-                j += 1
-
-            return childIndividual1, childIndividual2,
-
-        # changeable parameters
-        MUTPB = 1/len(process_list)
-        CXPB = 0.7
-        POPSIZE = 500
-        NGEN = 150
-        TNSIZE = 3
-
-        # registers all operators that are need with the toolbox
-        toolbox.register("evaluate", fitnessFunc)
-        toolbox.register("mate", orderedOneXOver)
-        toolbox.register("mutate", tools.mutShuffleIndexes, indpb=MUTPB)
-        toolbox.register("select", tools.selTournament, tournsize=TNSIZE)
-
-        def eaMain():
-            # sets population size
-            pop = toolbox.population(n=POPSIZE)
-
-            # keeps track of the single best solution found
-            hof = tools.HallOfFame(1)
-
-            # create a statistics object to calculate  stats
-            stats = tools.Statistics(lambda ind: ind.fitness.values)
-            stats.register("avg", np.mean)
-            stats.register("std", np.std)
-            stats.register("min", np.min)
-            stats.register("max", np.max)
-
-            # runs the algorithm with the given parameter values
-            pop, log = algorithms.eaSimple(pop, toolbox, cxpb=CXPB, mutpb=MUTPB, ngen=NGEN,
-                                           stats=stats, halloffame=hof, verbose=False)
-
-            return pop, log, hof
-
-        ##############################
-        # runs the main function
-        pop, log, hof = eaMain()
-
-        # the following commented block of code was used to carry out statistical significance test on the results of
-        # the algorithm using various parameters and values
-
-        # creates a dataframe to record the important data from each run
-        column_names = ['populationSize', 'fitness', 'genMinFound']
-        df = pd.DataFrame(columns=column_names)
-
-        """
-        # runs the ea 10 times
-        for reps in range(10):
-            pop, log, hof = eaMain()
-            # extracts the best fitness
-            best = hof[0].fitness.values[0]
-            # saves the generation this fitness was first found
-            min = log.select('min')
-            for gen in range(NGEN):
-                if min[gen] == best:
-                    break
-            #adds the important info to the dataframe
-            df = df.append({'populationSize': POPSIZE, 'fitness': best, 'genMinFound': gen}, ignore_index=True)
-            
-        """
-        """
-        # code for printing statistics and boxplots
-        print(df.groupby('populationSize').mean())
-        print(df.groupby('populationSize').median())
-        print(df.groupby('populationSize').std())
-
-        # plot a boxplot of fitness per population size
-        boxplot = df.boxplot(column=['fitness'], by=['populationSize'])
-        plt.show()
-        # plot genMaxFound per population size
-        boxplot = df.boxplot(column=['genMinFound'], by=['populationSize'])
-        plt.show()
-        """
-        """
-        #takes 2 of the datasets from different runs
-        mp0 = df.fitness[df.popsize == 50]
-        mp1 = df.genMaxFound[df.popsize == 100]
-        mp0l = mp0.tolist()
-        mp1l = mp1.tolist()
-
-        #normality testing the distribution of the results
-        stat, p = shapiro(mp0l)
-        print('normality p=%f' % (p))
-        
-        #applies the appropriate statistical test depending on the result of the normality test
-        if p < 0.05:
-            stat,p = mannwhitneyu(mp0l,mp1l)
-            print('p=%f' % (p))
-        else:
-            stat, p = ttest_ind(mp0l, mp1l)
-            print('p=%f' % (p))
-        """
-        ##############################
-
-        best = hof[0].fitness.values[0]  # best fitness found is stored at index 0 in the hof list
-
-        # look in the logbook to see what generation this was found at
-
-        min = log.select("min")  # min fitness per generation stored in log
-
-        # finds the generation at which the best fitness was found
-        for i in range(NGEN):
-            fit = min[i]
-            if fit == best:
-                break
-
-        print("min fitness found is %s at generation %s" % (best, i))
-
-        # the following block of commented code plots the fitness per generation
-        """
-        gen = log.select("gen")
-        fit_max = log.select("max")
-        fit_min = log.select("min")
-        fit_avg = log.select("avg")
-
-        fig, ax1 = plt.subplots()
-        #line1 = ax1.plot(gen, fit_max, "b-", label="max Fitness", color="r")
-        line2 = ax1.plot(gen, fit_min, "b-", label="min Fitness", color="b")
-        #line3 = ax1.plot(gen, fit_avg, "b-", label="avg Fitness", color="g")
-        ax1.set_xlabel("Generations")
-        ax1.set_ylabel("Fitness", color="b")
-        for tl in ax1.get_yticklabels():
-            tl.set_color("b")
-
-        #lns = line1 + line2 + line3
-        lns = line2
-        labs = [l.get_label() for l in lns]
-        ax1.legend(lns, labs, loc="center right")
-
-        plt.show()
-        """
-        process_list = hof[0]
-
-        waiting_times = []
-        turnaround_times = []
-        endtime = 0
-
-        for i in process_list:  # calculates the stats to be displayed within the webapp
-            endtime += i.duration
-            waitingTime = endtime - i.arrival_time - i.duration
-
-            if waitingTime < 0:
-                waitingTime = abs(waitingTime - i.arrival_time)
-                waiting_times.append(waitingTime)
-            else:
-                waiting_times.append(waitingTime)
-
-            turnaround_times.append(endtime - i.arrival_time)
-
-            self.data.append([i.name, endtime - i.duration, endtime, i.arrival_time])
-
-        meanWaitingTime = np.mean(waiting_times)
-        medianWaitingTime = np.median(waiting_times)
-        meanTurnaroundTime = np.mean(turnaround_times)
-        medianTurnaroundTime = np.median(turnaround_times)
-        print(meanWaitingTime)
-        tempStats = [meanWaitingTime, medianWaitingTime, meanTurnaroundTime, medianTurnaroundTime]
-
-        self.stats = tempStats
-        self.eastats = tempStats
-        print(meanWaitingTime)
-
-    """
-    """
+        started = time.perf_counter()  # The engine's time budget counts from here, the seeding is part of it.
+        seeds = None
+        # a run that resumes starts with the population of the previous one, it doesn't use seeds
+        if seed_heuristics and self.ea_engine.get_previous(self.table)[1] is None:
+            time_budget = self.ea_engine.time_budget
+            # with a time budget the seeding stops at its share, the heuristics that are not done by then are left out
+            seeds = self.get_heuristic_orders(None if time_budget is None else started + SEEDING_SHARE * time_budget)
+        self.ea_result = self.ea_engine.run(self.table, seeds=seeds, progress=self.progress, started=started)
+
+        # the best order is processed one process after the other, starting at 0
+        start = 0
+        for index in self.ea_result.best_order:
+            duration = int(self.table.duration[index])
+            self.add_data(index, start, duration)
+            start += duration
+
+        self.stats = self.ea_result.stats
+        self.eastats = self.ea_result.stats
 
     # SCHEDULING ALGORITHM SUPPORTING FUNCTIONS
-    def get_competing_processes(self) -> List[Process]:
-        """Returns a list of all jobs that already exist at this time (passed_time) and are not already finished."""
-        competing_processes: List[Process] = []
-        for process in self.process_list:
-            if process.arrival_time - self.passed_time <= 0 and not process.finished():
-                competing_processes.append(process)  # only jobs that exist and are not finished.
-        if len(competing_processes) > 0:  # Return list if there is at least one process in th list.
-            return competing_processes
-        else:  # If there is no job waiting to be processed, the passed time will be increased by one and the
-            # function gets called again
-            self.passed_time += 1
-            return self.get_competing_processes()
+    def arrived_processes(self) -> List[int]:
+        """Moves the arrival cursor forward to the passed time. Returns the indices of all processes that have shown up
+        since the last call (in the order of their arrival), processes that are already finished are left out."""
+        arrived = []
+        while self.next_arrival < len(self.arrivals) and \
+                self.table.arrival_time[self.arrivals[self.next_arrival]] <= self.passed_time:
+            index = self.arrivals[self.next_arrival]
+            if not self.state.finished(index):
+                arrived.append(index)
+            self.next_arrival += 1
+        return arrived
+
+    def get_next_arrival_time(self):
+        """Returns the arrival time of the next process that has not shown up yet, or None if all of them did."""
+        if self.next_arrival < len(self.arrivals):
+            return int(self.table.arrival_time[self.arrivals[self.next_arrival]])
+        return None
+
+    def skip_idle_time(self):
+        """If there is no job waiting to be processed, the passed time jumps straight to the next arrival."""
+        next_arrival_time = self.get_next_arrival_time()
+        if next_arrival_time is not None and next_arrival_time > self.passed_time:
+            self.passed_time = next_arrival_time
 
     def check_if_done(self) -> bool:
         """Checks if every process in process-list is finished, returns True or False."""
-        for process in self.process_list:
-            if not process.finished():
-                return False
-        return True
-
-    def process(self, process: Process):
+        return self.unfinished == 0
+
+    def count_if_finished(self, index: int):
+        """Has to be called after a process got processed, so the number of unfinished processes stays up to date."""
+        if self.state.finished(index):
+            self.unfinished -= 1
+            if self.progress is not None and self.unfinished % self.progress_step == 0:
+                finished = len(self.table) - self.unfinished
+                self.progress(finished / len(self.table),
+                              f'{finished} of {len(self.table)} processes finished at time {self.passed_time}')
+
+    def process(self, index: int):
         """This function does the processing part, which is the same for fcfs, sjf, hrrn (all non-preemtives)."""
-        duration = process.duration
-        self.add_data(process, self.passed_time, duration)
-        process.starting_time = self.passed_time
+        duration = int(self.table.duration[index])
+        self.add_data(index, self.passed_time, duration)
+        self.state.starting_time[index] = self.passed_time
         # Since this is only used for non-preemptives algorithms the whole process will be finished
         self.passed_time += duration  # by increasing the passed time by the process's duration.
-        process.process(duration, self.passed_time)  # The process itself need to be updated.
-
-    def add_data(self, process: Process, start: int, duration: int):
-        """Every piece that gets processed is saved as an entry in the data table."""
-        finish = start+duration
-        self.data.append([process.name, start, finish, process.arrival_time])
-
-    def time_formatter(self, time_units: int):
-        secs = str(time_units % 60)
-        mins = str(int(time_units / 60))
-        if len(mins) == 1:
-            mins = f'0{mins}'
-        if len(secs) == 1:
-            secs = f'0{secs}'
-        time = f'2020-01-01 00:{mins}:{secs}'
-        return time
+        self.state.process(index, duration, self.passed_time)  # The process itself need to be updated.
+        self.count_if_finished(index)
+
+    @property
+    def data(self) -> List:
+        """The data table of the latest run: an entry [name, start, finish, arrival] for every piece that got processed,
+        pieces of the same process right after each other are merged. It's only kept by a SegmentSink (the default) or
+        a ListSink."""
+        return self.sink.data
+
+    def add_data(self, index: int, start: int, duration: int):
+        """Every piece that gets processed is handed to the trace sink, by default it's saved in the data table."""
+        self.sink.add(self.table, index, start, start+duration)
+
+    def time_formatter(self, time_units: int) -> str:
+        """Turns time units into the datetime of the gantt chart, like '2020-01-01T01:02:05'. For many times at once
+        use GanttDetail.format_times, this is the same for a single one."""
+        return str(format_times(time_units))
 
     def data_plotly_formatted(self) -> List:
-        """Turns the data list into a list of dicts that can be used for the plotly/dash gantt chart."""
-        plotly_chart_data = []
-        for entry in self.data:
-            name = entry[0]
-            duration = entry[2]- entry[1]
-            start = self.time_formatter(entry[1])
-            finish = self.time_formatter(entry[2])
-            plotly_chart_data.append(dict(Task=name, Start=start, Finish=finish,
-                                          Description=f'Task: {name} Duration: {duration} Arrival: {entry[3]}'))
-        return plotly_chart_data
-
-    def process_one_step(self, process, latest_job):
-        """This is used for shortest and longest remaining time only (preemtives)."""
-        if process != latest_job and latest_job is not None:
+        """Turns the data list into a list of dicts that can be used for the plotly/dash gantt chart. The times of all
+        entries are converted at once."""
+        rows, names, starts, finishes, arrivals = get_columns(self.data, self.table)
+        return [dict(Task=names[row], Start=start, Finish=finish,
+                     Description=f'Task: {names[row]} Duration: {duration} Arrival: {arrival}')
+                for row, start, finish, duration, arrival in zip(rows.tolist(), format_times(starts).tolist(),
+                                                                 format_times(finishes).tolist(),
+                                                                 (finishes - starts).tolist(), arrivals.tolist())]
+
+    def process_run(self, index: int, latest_job, time_units: int):
+        """This is used for shortest and longest remaining time only (preemtives). The process gets processed for
+        'time_units' time units in a row."""
+        if index != latest_job and latest_job is not None:
             # This is the case if the process that will be processed in this step is a different from the previous one.
             # Then the data from the previous one need to be added to the data table.
-            self.add_data(latest_job, latest_job.row_start_time, latest_job.row,)
-            latest_job.row_start_time = None
-            latest_job.row = 0  # And the previous job's row data  goes back to 0.
+            self.add_data(latest_job, self.row_start_time, self.row)
+            self.row_start_time = None
+            self.row = 0  # And the previous job's row data  goes back to 0.
 
-        if process.starting_time is None:
+        if self.state.starting_time[index] == NOT_SET:
             # If this is the first step for the current process, the starting time is set.
-            process.starting_time = self.passed_time
+            self.state.starting_time[index] = self.passed_time
 
-        if process.row_start_time is None:
+        if self.row_start_time is None:
             # If this is the first step in the current row of the current process, its row starting time is set.
-            process.row_start_time = self.passed_time
-
-        # With preemtive algorithms only one step at a time is possible
-        process.row += 1  # Increase jobs row by one.
-        process.remaining_time -= 1  # The remaining time is now one time unit shorter.
-        self.passed_time += 1  # And the simulations passed time is also by one time unit increased.
+            self.row_start_time = self.passed_time
 
-        if process.finished():
-            process.end_time = self.passed_time
+        self.row += time_units  # Increase jobs row by the length of the run.
+        self.passed_time += time_units  # The simulations passed time is increased by the same amount.
+        self.state.process(index, time_units, self.passed_time)  # The end time is set if it is finished now.
+        self.count_if_finished(index)
 
     def get_stats(self):
         """Returns an Array with the Stats: [waiting time mean, waiting median, turnaround mean ...]"""
-        waiting_times = [x.get_waiting_time() for x in self.process_list]
-        turnaround_times = [x.get_turnaround_time() for x in self.process_list]
+        waiting_times = self.state.get_waiting_times()
+        turnaround_times = self.state.get_turnaround_times()
         return [
             np.mean(waiting_times),
             np.median(waiting_times),
@@ -512,26 +400,175 @@ class Scheduler:
             np.median(turnaround_times)
         ]
 
-    def run_all(self):
-        """Runs every algorithms and returns the stats in a dict for everyone of them."""
-        stats = {}
-        self.non_preemtive_algorithms()
-        stats["fcfs"] = self.get_stats()
-        self.non_preemtive_algorithms(sjf=True)
-        stats["sjf"] = self.get_stats()
-        self.non_preemtive_algorithms(hrrn=True)
-        stats["hrrn"] = self.get_stats()
-        self.remaining_time_first()
-        stats["srtf"] = self.get_stats()
-        self.remaining_time_first(longest=True)
-        stats["lrtf"] = self.get_stats()
-        self.round_robin()
-        stats["rr"] = self.get_stats()
-        self.ea()
-        stats["ea"] = self.eastats
-        return stats
+    def evaluate_orders(self, orders):
+        """Evaluates processing the processes one after the other in a fixed order, without preemption - the way fcfs,
+        sjf and hrrn do once they have picked their order. Instead of simulating, everything is calculated with NumPy:
+        A process ends after all durations up to it in the order, plus the idle time that was needed up to then. The
+        processor idles whenever a process arrives later than the work before it is done, so the idle time up to a
+        position is the largest gap between an arrival and the work done before it.
+        'orders' is either one order (a 1-D array of process indices) or a batch of orders (a 2-D array, one order per
+        row). An order may leave out processes, it's evaluated as if only those were there. Returns the start times and
+        end times per process index (one row per order, NOT_SET for the processes an order leaves out) and the stats:
+        for one order a list like get_stats returns, for a batch an array with the four stats in every row."""
+        self.update_process_list()
+        orders = np.asarray(orders, dtype=np.int64)
+        durations = self.table.duration[orders]
+        arrival_times = self.table.arrival_time[orders]
+        work_done = np.cumsum(durations, axis=-1)  # Sum of all durations up to and including a position.
+        # Idle time needed before a position, the simulation starts at time 0 so it's never negative.
+        idle_time = np.maximum(np.maximum.accumulate(arrival_times - (work_done - durations), axis=-1), 0)
+        end_times = work_done + idle_time
+        waiting_times = end_times - arrival_times - durations
+        turnaround_times = end_times - arrival_times
+        stats = np.stack([
+            np.mean(waiting_times, axis=-1),
+            np.median(waiting_times, axis=-1),
+            np.mean(turnaround_times, axis=-1),
+            np.median(turnaround_times, axis=-1)
+        ], axis=-1)
+        # The times are calculated in the order of processing, but get returned by process index.
+        shape = orders.shape[:-1] + (len(self.table),)
+        process_starting_times = np.full(shape, NOT_SET, dtype=np.int64)
+        process_end_times = np.full(shape, NOT_SET, dtype=np.int64)
+        np.put_along_axis(process_starting_times, orders, end_times - durations, axis=-1)
+        np.put_along_axis(process_end_times, orders, end_times, axis=-1)
+        if stats.ndim == 1:
+            stats = list(stats)
+        return process_starting_times, process_end_times, stats
+
+    def get_heuristic_orders(self, deadline: float = None) -> List[List[int]]:
+        """Returns the orders in which fcfs, sjf and hrrn process the processes (without duplicates) as lists of process
+        indices. They are simulated by a separate Scheduler, which shares the process table. With a deadline (a
+        time.perf_counter() value) only the orders of the heuristics that are done by then are returned."""
+        scheduler = Scheduler(self.table)
+        scheduler.set_trace_sink(NullSink)  # Only the starting times are needed.
+        if deadline is not None:
+            def check_deadline(fraction, message):  # Called every time another percent of the processes finished.
+                if time.perf_counter() > deadline:
+                    raise OutOfTime()
+            scheduler.set_progress(check_deadline)
+        orders = []
+        for sjf, hrrn in ((False, False), (True, False), (False, True)):
+            try:
+                scheduler.non_preemtive_algorithms(sjf=sjf, hrrn=hrrn)
+            except OutOfTime:
+                break
+            order = np.argsort(scheduler.state.starting_time, kind='stable').tolist()
+            if order not in orders:
+                orders.append(order)
+        return orders
+
+    def run(self, algorithm: str):
+        """Runs one algorithm by its short name (see ALGORITHMS) and returns its stats. If the scheduler has a cache
+        and the same processes already ran with the same algorithm and parameters, the result is taken from there."""
+        self.cache_key = self.get_cache_key(algorithm)
+        if self.cache_key is not None:
+            result = self.cache.get(self.cache_key)
+            if result is None and self.cache_key[-1] == "stats":  # A result with data has the stats as well.
+                result = self.cache.get(self.cache_key[:-1] + ("data",))
+            if result is not None:
+                self.sink = ListSink(result.data) if self.cache_key[-1] == "data" else NullSink()
+                self.stats = result.stats
+                self.state = result.state
+                self.processes = None
+                if algorithm == "ea":
+                    self.eastats = result.stats
+                    self.ea_result = result.ea_result
+                return result.stats
+
+        if algorithm == "fcfs":
+            self.non_preemtive_algorithms()
+        elif algorithm == "sjf":
+            self.non_preemtive_algorithms(sjf=True)
+        elif algorithm == "hrrn":
+            self.non_preemtive_algorithms(hrrn=True)
+        elif algorithm == "srtf":
+            self.remaining_time_first()
+        elif algorithm == "lrtf":
+            self.remaining_time_first(longest=True)
+        elif algorithm == "rr":
+            self.round_robin()
+        elif algorithm == "ea":
+            self.ea()
+        else:
+            raise ValueError(f'Unknown algorithm: {algorithm}')
 
+        if self.cache_key is not None:
+            self.cache.put(self.cache_key, CachedResult(self.data, self.stats, self.state,
+                                                        self.ea_result if algorithm == "ea" else None))
+        return self.stats
 
+    def run_all(self):
+        """Runs every algorithms and returns the stats in a dict for everyone of them."""
+        key = self.get_cache_key("all")
+        result = self.cache.get(key) if key is not None else None
+        if result is None:
+            progress = self.progress
+            trace_sink = self.trace_sink
+            self.trace_sink = NullSink  # Only the stats are returned, so the segments don't need to be kept.
+            stats = {}
+            try:
+                for i, algorithm in enumerate(ALGORITHMS):
+                    if progress is not None:  # The progress of every algorithm is a part of the whole progress.
+                        self.progress = lambda fraction, message, i=i, algorithm=algorithm: progress(
+                            (i + fraction) / len(ALGORITHMS), f'{algorithm}: {message}')
+                    stats[algorithm] = self.run(algorithm)
+            finally:
+                self.progress = progress
+                self.trace_sink = trace_sink
+            result = CachedResult(None, stats, None)
+            if key is not None:
+                self.cache.put(key, result)
+        self.cache_key = key
+        return result.stats
+
+    def get_cache_key(self, algorithm: str):
+        """Returns the key of the result of an algorithm ("all" for run_all) in the cache. It's None if there is no
+        cache, if the result can't be repeated - like an ea run without a seed - or if the trace sink has to receive
+        the segments. The key of a single algorithm ends with the kind of the trace sink (see TraceSink)."""
+        kind = getattr(self.trace_sink, "kind", None)
+        if self.cache is None or (kind is None and algorithm != "all"):
+            return None
+        self.update_process_list()
+        if algorithm == "rr":
+            parameters = self.quantum
+        elif algorithm == "ea":
+            parameters = self.ea_engine.get_cache_key(self.table)
+            if parameters is None:
+                return None
+        elif algorithm == "all":
+            parameters = (self.quantum, self.ea_engine.get_cache_key(self.table))
+            if parameters[1] is None:
+                return None
+        else:
+            parameters = None
+        if algorithm == "all":
+            return self.table.get_hash(), algorithm, parameters
+        return self.table.get_hash(), algorithm, parameters, kind
+
+    def get_figure(self, name: str, build):
+        """Returns the figure with the given name for the latest result of run or run_all. It is built by calling
+        build() only if the cache doesn't have it yet."""
+        if self.cache is None:
+            return build()
+        return self.cache.get_figure(self.cache_key, name, build)
+
+    def run_all_parallel(self, algorithms=ALGORITHMS, executor: Executor = None):
+        """Like run_all, but every algorithm runs at the same time in its own worker, with its own Scheduler and state
+        on the same process table - the comparison takes about as long as the slowest algorithm. 'executor' can be any
+        ThreadPoolExecutor or ProcessPoolExecutor, by default a process pool with one process per algorithm is used:
+        the simulations are pure Python and hold the GIL, so threads would hardly run at the same time. The table is
+        sent to the processes as its path if it was loaded (see ProcessTable.__reduce__), otherwise as a copy.
+        The dict has the algorithms in the order they were asked for. This Scheduler's own state stays untouched."""
+        if not algorithms:
+            return {}
+        self.update_process_list()
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=len(algorithms)) as executor:
+                return self.run_all_parallel(algorithms, executor)
+        futures = {algorithm: executor.submit(run_algorithm, self.table, algorithm, self.quantum, self.ea_engine)
+                   for algorithm in algorithms}
+        return {algorithm: future.result() for algorithm, future in futures.items()}
 
     def info(self):
         for p in self.process_list:
@@ -539,26 +576,39 @@ class Scheduler:
 
     # Create Colors for Gantt Chart
     def get_colors(self):
+        """Returns the color of every process name. The processes take turns with the colors in the order of the table,
+        a name that shows up more than once gets the color of its last process. That needs one pass over the name ids,
+        no Process objects."""
         self.update_process_list()
-        colors = [
-            'rgb(181, 18, 80)',
-            'rgb(219, 202, 13)',
-            'rgb(23, 18, 181)',
-            'rgb(62, 161, 16)',
-            'rgb(150, 35, 35)',
-            'rgb(18, 127, 181)',
-            'rgb(227, 112, 18)',
-            'rgb(110, 18, 181)',
-            'rgb(33, 219, 185)',
-            'rgb(181, 18, 170)',
-            'rgb(33, 219, 92)'
-        ]
-        color_dict = {}
-        i = 0
-        for process in self.process_list:
-            color_dict[process.name] = colors[i % len(colors)]
-            i += 1
-        return color_dict
+        last = np.full(len(self.table.names), -1, dtype=np.int64)  # The last index of every name inside the table.
+        np.maximum.at(last, self.table.name_id, np.arange(len(self.table)))
+        return {name: COLORS[i % len(COLORS)] for name, i in zip(self.table.names, last.tolist()) if i >= 0}
 
     def set_quantum(self, value: int):
         self.quantum = value
+
+    def set_ea_workers(self, value: int = None):
+        """Lets the ea evaluate its fitness in 'value' worker processes. The pool is kept and reused by every following
+        ea run (of every Scheduler with the same number of workers). None switches back to the current process."""
+        self.ea_engine.workers = value
+
+    def set_progress(self, progress=None):
+        """Lets the simulations report their progress by calling progress(fraction, message), with a fraction from 0 to
+        1. The ea reports every generation, the other algorithms every time another percent of the processes finished.
+        If it raises an exception, the simulation stops with that exception (e.g. JobCancelled)."""
+        self.progress = progress
+
+    def set_trace_sink(self, trace_sink=SegmentSink):
+        """Sets what makes the trace sink for every run: a TraceSink class or any function that returns a new sink,
+        e.g. lambda: FileSink('trace.csv'). The default SegmentSink keeps the data table in memory, NullSink only lets
+        the stats be calculated."""
+        self.trace_sink = trace_sink
+
+    def set_cache(self, cache: ResultCache = None):
+        """Lets run and run_all take results from the cache (and put new ones in). Many Schedulers can share a cache.
+        None switches the cache off."""
+        self.cache = cache
+
+    def set_ea_engine(self, engine: EvolutionaryAlgorithm):
+        """Replaces the EvolutionaryAlgorithm of the ea, e.g. one with a seed or other parameters."""
+        self.ea_engine = engine
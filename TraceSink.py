@@ -0,0 +1,145 @@
+"""A trace sink receives every segment a simulation processes: which process ran from when to when. The Scheduler hands
+every segment to its sink (see Scheduler.set_trace_sink) and a new sink is made for every run. The sinks decide what
+happens to the segments:
+ - SegmentSink keeps them in memory as Segments - that's the Scheduler's data for the gantt chart. ListSink keeps them
+   as a list of [name, start, finish, arrival].
+ - FileSink writes them into a csv file, GeneratorSink sends them into a generator, both as soon as they are done.
+ - NullSink drops them, for runs that only need the stats. Those need the same memory no matter how many segments
+   there are."""
+
+from array import array
+from collections.abc import Sequence
+from typing import List
+
+import numpy as np
+
+
+class TraceSink:
+    """Base class of all sinks. 'kind' tells the ResultCache what a result of a run with this sink holds: "data" if
+    the segments are kept, "stats" if only the stats are, None if the run must not be taken from the cache (because the
+    sink does something with the segments)."""
+    kind = None
+
+    def add(self, table, index: int, start: int, finish: int):
+        """Receives the segment of the process with the index inside the table, processed from start to finish."""
+        raise NotImplementedError
+
+    def close(self):
+        """Called once the run is done."""
+
+    @property
+    def data(self) -> List:
+        """The segments that are kept in memory."""
+        return []
+
+
+class Segments(Sequence):
+    """The segments of a run, stored as three typed arrays: the index of the process inside the table, start and
+    finish. That takes 24 bytes per segment instead of a list per segment. A segment that continues the previous one
+    (same process, starts when the previous one finishes) is merged into it. Read as a sequence, every segment is
+    [name, start, finish, arrival] - exactly like an entry of the list the ListSink keeps."""
+    def __init__(self, table):
+        self.table = table
+        self.index = array('q')
+        self.start = array('q')
+        self.finish = array('q')
+
+    def append(self, index: int, start: int, finish: int):
+        if self.index and self.index[-1] == index and self.finish[-1] == start:
+            self.finish[-1] = finish
+        else:
+            self.index.append(index)
+            self.start.append(start)
+            self.finish.append(finish)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        index = self.index[position]
+        return [self.table.get_name(index), self.start[position], self.finish[position],
+                int(self.table.arrival_time[index])]
+
+    def __eq__(self, other):
+        if not isinstance(other, (Sequence, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def get_arrays(self):
+        """Returns copies of the columns as int64 arrays: process indices, starts and finishes."""
+        return (np.array(self.index, dtype=np.int64), np.array(self.start, dtype=np.int64),
+                np.array(self.finish, dtype=np.int64))
+
+
+class SegmentSink(TraceSink):
+    """Keeps the segments in memory as Segments."""
+    kind = "data"
+
+    def __init__(self):
+        self.segments = None  # Built by the first segment, they need to know the table.
+
+    def add(self, table, index: int, start: int, finish: int):
+        if self.segments is None:
+            self.segments = Segments(table)
+        self.segments.append(index, start, finish)
+
+    @property
+    def data(self):
+        return [] if self.segments is None else self.segments
+
+
+class ListSink(TraceSink):
+    kind = "data"
+
+    def __init__(self, segments: List = None):
+        self.segments = [] if segments is None else segments
+
+    def add(self, table, index: int, start: int, finish: int):
+        self.segments.append([table.get_name(index), start, finish, int(table.arrival_time[index])])
+
+    @property
+    def data(self) -> List:
+        return self.segments
+
+
+class NullSink(TraceSink):
+    kind = "stats"
+
+    def add(self, table, index: int, start: int, finish: int):
+        pass
+
+
+class FileSink(TraceSink):
+    """Appends every segment as a line 'name,start,finish,arrival' to a csv file, with a header line at the top."""
+    def __init__(self, path):
+        self.file = open(path, 'w')
+        self.file.write('name,start,finish,arrival\n')
+
+    def add(self, table, index: int, start: int, finish: int):
+        self.file.write(f'{table.get_name(index)},{start},{finish},{table.arrival_time[index]}\n')
+
+    def close(self):
+        self.file.close()
+
+
+class GeneratorSink(TraceSink):
+    """Sends every segment as [name, start, finish, arrival] into a generator, that gets closed when the run is done:
+        def consumer():
+            while True:
+                name, start, finish, arrival = yield
+                ...
+        scheduler.set_trace_sink(lambda: GeneratorSink(consumer()))"""
+    def __init__(self, generator):
+        self.generator = generator
+        next(self.generator)  # Runs the generator up to its first yield, so it can receive segments.
+
+    def add(self, table, index: int, start: int, finish: int):
+        self.generator.send([table.get_name(index), start, finish, int(table.arrival_time[index])])
+
+    def close(self):
+        self.generator.close()
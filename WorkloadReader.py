@@ -0,0 +1,128 @@
+"""Reads workloads from csv files formatted as 'name, duration, arrival_time' with a header row. The file is read in
+chunks, every chunk is handed out as three columns (names, durations, arrival times) as soon as it is parsed. So even a
+huge file never has to be in memory as a whole, and there is never a Process object per row: ProcessTable.from_chunks
+builds the table straight from the chunks.
+Every row is checked, a row that can't be a process raises a WorkloadFormatError that tells the line of the file. Blank
+lines are skipped, columns after the third are ignored. Quotes are no csv quoting, a row is always split at every
+comma - so a name can't hold a comma, and '"A,1",3,0' is rejected by both ways of parsing."""
+
+import csv
+import os
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from ProcessTable import ProcessTable
+
+Chunk = Tuple[List[str], np.ndarray, np.ndarray]  # Names, durations and arrival times of the processes of a chunk.
+PANDAS_MIN_SIZE = 1000000  # Files with fewer bytes are parsed without pandas, importing it takes longer than parsing.
+
+
+class WorkloadFormatError(ValueError):
+    """A row of a workload file that can't be read as a process."""
+    def __init__(self, filepath, line_number: int, reason: str):
+        super().__init__(f'{filepath}, line {line_number}: {reason}')
+        self.filepath = filepath
+        self.line_number = line_number
+        self.reason = reason
+
+
+def read_chunks(filepath, chunk_size: int = 100000, use_pandas: bool = None) -> Iterator[Chunk]:
+    """Yields the processes of the csv file in chunks of at most chunk_size rows. With use_pandas the rows are parsed by
+    pandas' C parser, which is a lot faster for large files. None uses pandas if it's installed and the file has at
+    least PANDAS_MIN_SIZE bytes."""
+    if use_pandas is None:
+        use_pandas = False
+        if os.path.getsize(filepath) >= PANDAS_MIN_SIZE:
+            try:
+                import pandas
+                use_pandas = True
+            except ImportError:
+                pass
+    if use_pandas:
+        return read_chunks_pandas(filepath, chunk_size)
+    return read_chunks_python(filepath, chunk_size)
+
+
+def read_table(filepath, chunk_size: int = 100000, use_pandas: bool = None) -> ProcessTable:
+    """Reads the csv file into a ProcessTable, which can be used by the Scheduler in place of a process list."""
+    return ProcessTable.from_chunks(read_chunks(filepath, chunk_size, use_pandas))
+
+
+def convert_csv(filepath, path, chunk_size: int = 100000, use_pandas: bool = None) -> ProcessTable:
+    """Reads the csv file once and saves it in the binary format of ProcessTable.save into the directory 'path'. From
+    then on ProcessTable.load(path) maps it into memory, which takes milliseconds no matter how large it is."""
+    table = read_table(filepath, chunk_size, use_pandas)
+    table.save(path)
+    return table
+
+
+def read_chunks_python(filepath, chunk_size: int) -> Iterator[Chunk]:
+    """Parses the rows one by one, without anything but the standard library."""
+    with open(filepath, 'r') as file:
+        file.readline()  # Skip the first row inside csv file.
+        names, durations, arrival_times = [], [], []
+        for line_number, line in enumerate(file, start=2):
+            if not line.strip():
+                continue  # Blank lines (like the one at the end of the file) are no processes.
+            row = line.split(',')  # Separate row into its 3 parts, at the comma.
+            if len(row) < 3:
+                raise WorkloadFormatError(filepath, line_number, f'expected 3 columns, found {len(row)}')
+            try:
+                duration = int(row[1])
+                arrival_time = int(row[2])
+            except ValueError:
+                raise WorkloadFormatError(filepath, line_number,
+                                          f'duration and arrival time must be integers: {line.strip()}') from None
+            check_row(filepath, line_number, duration, arrival_time)
+            names.append(row[0])
+            durations.append(duration)
+            arrival_times.append(arrival_time)
+            if len(names) == chunk_size:
+                yield names, np.array(durations, dtype=np.int64), np.array(arrival_times, dtype=np.int64)
+                names, durations, arrival_times = [], [], []
+        if names:
+            yield names, np.array(durations, dtype=np.int64), np.array(arrival_times, dtype=np.int64)
+
+
+def read_chunks_pandas(filepath, chunk_size: int) -> Iterator[Chunk]:
+    """Parses a whole chunk at once with pandas, and checks it column-wise. The names are kept as strings, even if they
+    look like numbers. Durations and arrival times that are all integers end up in integer columns. Pandas raises a
+    ValueError (its ParserError is one as well) for rows it can't split into the columns, e.g. a short first row - those
+    are located by raise_format_error, too."""
+    import pandas as pd
+    try:
+        reader = pd.read_csv(filepath, header=None, skiprows=1, usecols=[0, 1, 2], dtype={0: str},
+                             keep_default_na=False, quoting=csv.QUOTE_NONE, chunksize=chunk_size)
+    except pd.errors.EmptyDataError:
+        return  # There is nothing but the header.
+    except ValueError as error:
+        raise_format_error(filepath, str(error))
+    try:
+        for frame in reader:
+            durations = frame[1].to_numpy()
+            arrival_times = frame[2].to_numpy()
+            if durations.dtype.kind != 'i' or arrival_times.dtype.kind != 'i' or (durations <= 0).any() or \
+                    (arrival_times < 0).any():
+                raise_format_error(filepath)
+            yield frame[0].tolist(), durations.astype(np.int64), arrival_times.astype(np.int64)
+    except WorkloadFormatError:
+        raise  # Located already.
+    except ValueError as error:
+        raise_format_error(filepath, str(error))
+
+
+def raise_format_error(filepath, reason: str = 'the file could not be parsed'):
+    """Pandas only tells that a chunk has a row that is no valid process. To find out which one, the file is read once
+    more row by row. That's slow, but only happens for a file that can't be used anyway."""
+    for _ in read_chunks_python(filepath, 100000):
+        pass
+    raise WorkloadFormatError(filepath, 0, reason)  # Only if every row on its own looks fine.
+
+
+def check_row(filepath, line_number: int, duration: int, arrival_time: int):
+    """A process needs at least one time unit to be done, and it can't show up before the simulation starts."""
+    if duration <= 0:
+        raise WorkloadFormatError(filepath, line_number, f'duration must be positive, not {duration}')
+    if arrival_time < 0:
+        raise WorkloadFormatError(filepath, line_number, f'arrival time must not be negative, not {arrival_time}')
@@ -7,20 +7,27 @@ __author__ = "Anton Roesler"
 __email__ = "anton.roesler@stud.fra-uas.de"
 
 import os
+import json
+import hashlib
 import dash
 #import dash_html_components as html
 from dash import html
 #import dash_core_components as dcc
 from dash import dcc
-import plotly.figure_factory as ff
 #import dash_table
 from dash import dash_table
 import flask
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 from dash.dependencies import Input, Output, State
-from Scheduler import Scheduler
+from Scheduler import Scheduler, ALGORITHMS
+from ResultCache import ResultCache
+from EvolutionaryAlgorithm import EvolutionaryAlgorithm
 from ProcessList import ProcessListAdministration
+from ProcessTable import ProcessTable
+from JobExecutor import JobExecutor
+from GanttDetail import get_x_range
+from GanttFigure import gantt_figure
 
 # VARIABLES
 filename = 'processes.csv'  # the filename or path to the csv file with the processes on it
@@ -33,30 +40,37 @@ algorithm_titles = [
     "Round Robin",
     "Evolutionary Algorithm"
 ]
-num_clicks = 0
 quantum = 3  # Used for the Round Robin Algortihm
 
-
-class Namer:
-    """A class to store variables and their values in (in for of a dict. I used it for storing user inputs."""
-    def __init__(self):
-        self.names = dict()
-
-    def set(self, name, value):
-        """Adds a new entry or updates an existing one in the dict."""
-        self.names[name] = value
-
-    def get(self, name):
-        """Outputs a value to a given key. Or None if there is no key with that name."""
-        return self.names.get(name)
-
-
-namer = Namer()
-
 # SIMULATOR
+# Nothing a user changes is kept in here. The processes of a session are stored in the browser (see session_store) and
+# sent with every callback, so every thread and every worker process of the app sees the same processes. A callback
+# builds a Scheduler of its own for them, that way concurrent users never share a simulation.
 process_list = ProcessListAdministration()
 process_list.read_csv(filename)
-scheduler = Scheduler(process_list)
+# Every session starts with these processes, as rows of [name, duration, arrival time].
+default_processes = [[p.name, p.duration, p.arrival_time] for p in process_list.processes]
+result_cache = ResultCache()  # Results and figures of earlier simulations, shared by every Scheduler of the app.
+# The ea runs with a fixed seed, so its results can be repeated and cached just like the ones of the other algorithms.
+# It deliberately does not resume: a resumed run starts from the population of the latest one, so every view of the
+# same processes would evolve further (and miss the cache) instead of showing the same cached chart.
+ea_engine = EvolutionaryAlgorithm(seed=0, resume=False)
+# The simulations run in the background, the browser polls their progress and fetches the result when they are done.
+jobs = JobExecutor()
+poll_interval = 500  # Milliseconds between two polls of a running simulation.
+
+
+def get_scheduler(processes, quantum) -> Scheduler:
+    """Returns a new Scheduler for the processes (rows of [name, duration, arrival time]) of a session."""
+    if not processes:
+        processes = [['null', 1, 0]]  # if the list is completely empty a pseudo process is used, like in the ProcessList.
+    names, durations, arrival_times = zip(*processes)
+    scheduler = Scheduler(ProcessTable.from_columns(list(names), durations, arrival_times))
+    scheduler.set_cache(result_cache)
+    scheduler.set_ea_engine(ea_engine)
+    scheduler.set_quantum(quantum)
+    return scheduler
+
 
 # Dash
 BS = 'https://stackpath.bootstrapcdn.com/bootswatch/4.4.1/flatly/bootstrap.min.css'
@@ -116,7 +130,8 @@ dropdown = dcc.Dropdown(
 
 )
 
-chart = html.Div(id='chart')  # This is the chart object!
+chart = html.Div(dcc.Graph(id='graph'), id='chart')  # This is the chart object!
+chart_progress = html.Div(id='chart-progress')  # Shows how far the simulation of the chart is, while it runs.
 
 # An Input field to let the user add his own processes
 add_process_field = dbc.InputGroup(
@@ -185,21 +200,44 @@ slider_card = dbc.Card(
 # The Compare Button opens a Modal where one can see a bar chart with all the stats compared
 compare = dbc.Button("Compare Algorithms", id='compare', color='info', block=True)
 
-namer.set("quantum", 3)  # Default value of the quantum is 3. Changes as the slider changes.
+# The processes of the session, kept in the browser's session storage.
+session_store = dcc.Store(id='processes', storage_type='session', data=default_processes)
+# The jobs that simulate the chart and the comparison, and the timers that poll them while they run. A poll that
+# reaches a worker process of the app that doesn't know the job asks for it to be submitted again (the resubmit stores).
+job_stores = html.Div([
+    dcc.Store(id='chart-job'),
+    dcc.Store(id='compare-job'),
+    dcc.Store(id='chart-resubmit'),
+    dcc.Store(id='compare-resubmit'),
+    dcc.Interval(id='chart-poll', interval=poll_interval, disabled=True),
+    dcc.Interval(id='compare-poll', interval=poll_interval, disabled=True)
+])
 
 
 # The Compare Modal shows a bar chart to compare the stats of all of the Algorithms
-def get_comparison():
-    """Returns Data to compare all the stats of the algorithm. By running every Algorithm in a separate Scheduler."""
-    c_scheduler = Scheduler(process_list)  # A new separate Scheduler to run the comparison in.
+def get_comparison(processes=default_processes, quantum=quantum, progress=None):
+    """Returns Data to compare all the stats of the algorithm. By running every Algorithm in a separate Scheduler.
+    'progress' gets called with the progress of the simulations (see Scheduler.set_progress)."""
+    c_scheduler = get_scheduler(processes, quantum)  # A new separate Scheduler to run the comparison in.
+    c_scheduler.set_progress(progress)
     stat_names = [  # Names of the Stats for the x-axis.
         "Waiting Time Mean",
         "Waiting Time Median",
         "Turnaround Time Mean",
         "Turnaround Time Median",
         ]
-    c_scheduler.set_quantum(namer.get("quantum"))  # Set quantum for Round Robin to right value before run simulation.
     stats = c_scheduler.run_all()  # Get the stats.
+    return c_scheduler.get_figure("comparison", lambda: comparison_figure(stats, stat_names))
+
+
+def prewarm():
+    """Runs the comparison as a background job, so its results are in the cache before the modal is opened the first
+    time. The app can serve requests in the meantime."""
+    jobs.submit(get_comparison, default_processes, quantum)
+
+
+def comparison_figure(stats, stat_names):
+    """Builds the bar chart that compares the stats of all algorithms."""
     fig = go.Figure()  # Create a figure
     fcfs = [f'{x} - {algorithm_titles[0]}' for x in stats["fcfs"]]
     sjf = [f'{x} - {algorithm_titles[1]}' for x in stats["sjf"]]
@@ -223,7 +261,8 @@ compare_modal = dbc.Modal(  # A modal that shows a bar chart to compare the Algo
         dbc.ModalHeader("COMPARE HOW GOOD THE DIFFERENT ALGORITHMS ARE"),
         dbc.ModalBody(
             [
-                dcc.Graph(id="bar-chart", figure=get_comparison())
+                html.Div(id='compare-progress'),
+                dcc.Graph(id="bar-chart")  # The comparison only runs when the modal is opened (or by prewarm).
             ]
         ),
         dbc.ModalFooter(
@@ -250,7 +289,10 @@ app.layout = dbc.Container(
         ),
         dbc.Row(
             dbc.Col(
-                chart
+                [
+                    chart_progress,
+                    chart
+                ]
             )
         ),
         dbc.Row(add_text),
@@ -287,142 +329,135 @@ app.layout = dbc.Container(
             ],
             justify='center'
         ),
-        compare_modal
+        compare_modal,
+        session_store,
+        job_stores
     ], style={'padding': 20}
 )
 
 
-@app.callback(
-    Output('chart', 'children'),
-    [Input('demo-dropdown', 'value'), Input("add-button", "n_clicks"),
-     Input("clear-button", "n_clicks"), Input('slider-text', 'children')])
-def update_output(value, x, y, z):
-    """This is to updated the main gantt chart if the user changes the value of the dropdown menu."""
-    if value == 1:  # For the clicked value the Algorithm will be executed.
-        a_title = algorithm_titles[1]
-        scheduler.non_preemtive_algorithms(sjf=True)
-    elif value == 2:
-        a_title = algorithm_titles[2]
-        scheduler.non_preemtive_algorithms(hrrn=True)
-    elif value == 3:
-        a_title = algorithm_titles[3]
-        scheduler.remaining_time_first()
-    elif value == 4:
-        a_title = algorithm_titles[4]
-        scheduler.remaining_time_first(longest=True)
-    elif value == 5:
-        a_title = algorithm_titles[5]
-        scheduler.round_robin()
-    elif value == 6:
-        a_title = algorithm_titles[6]
-        scheduler.ea()
+def simulate(processes, quantum, value, x_range=None, progress=None):
+    """Simulates the algorithm with the given value of the dropdown menu. This runs as a job in the background, it
+    returns the gantt chart for the time range x_range (None for the whole simulation) and the stats. The Scheduler
+    (and its trace) is not kept, zooming in is another job that gets it from the cache again - or simulates once more
+    if it's not in there anymore."""
+    a_title = algorithm_titles[value]
+    scheduler = get_scheduler(processes, quantum)
+    scheduler.set_progress(progress)
+    stats = scheduler.run(ALGORITHMS[value])  # For the clicked value the Algorithm will be executed (or cached).
+    if x_range is None:
+        fig = scheduler.get_figure("gantt", lambda: gantt_figure(scheduler, a_title))
     else:
-        a_title = algorithm_titles[0]
-        scheduler.non_preemtive_algorithms()
-    data = scheduler.data_plotly_formatted()  # The data is what was simulated by the Scheduler.
-    data = sorted(data, key=lambda i: i['Task'])
-    fig = ff.create_gantt(data, group_tasks=True, showgrid_x=True, title=a_title + " visualized:",
-                          colors=scheduler.get_colors(), index_col='Task', show_colorbar=True)
-    fig.layout.xaxis.tickformat = "%Mm %Ss"  # Show minutes and Seconds as '00m 00s'
-    graph = dcc.Graph(id="graph", figure=fig)  # Create the graph.
+        fig = gantt_figure(scheduler, a_title, x_range)
+    return fig, stats
 
-    return graph
 
+def progress_bar(job):
+    """Shows the progress of a job that is still running."""
+    return html.Div([dbc.Progress(value=100 * job.fraction), html.Div(job.message)], style={'padding': 10})
 
-# CALLBACKS FOR THE ADD-A-NEW-PROCESS INPUT FIELD GROUP
-@app.callback(
-    Output("add-button", "children"),  #
-    [Input("add-button", "n_clicks")]
-)
-def add_button_click(n, num_clicks=num_clicks):
-    """This is the call back function for the Add button. What it does, is take the values from the fields, which are
-    stored in the variables by their own call backs. And if everything needed is there, a new Process will be created
-    inside the process list with te input given by the user."""
-    if n is None:
-        n = 0
-    if n-num_clicks == 0:
-        pass
-    elif namer.get('name') is None or namer.get('duration') is None or namer.get('arrival') is None:
-        pass
-    else:
-        exists = False
-        for p in process_list.processes:  # DONT Use get_process_list -> it returns a deepcopy.
-            # First we see if a process name already exists inside the list, if so: its values will get adjusted:
-            if p.name == namer.get('name'):  # User inputs are stored in the namer.
-                process_list.remove(p)
-                process_list.add(namer.get('name'), namer.get('duration'), namer.get('arrival'))
-                exists = True
-                break
-        if not exists:  # Only if a process name does not already exists in the list ir will be added.
-            process_list.add(namer.get('name'), namer.get('duration'), namer.get('arrival'))
-
-
-# CALLBACKS FOR THE USER INPUTS
-# User inputs will be saved in the Namer!
-@app.callback(
-    Output("name-input", "value"),  #
-    [Input("name-input", "value")]
-)
-def update_name(value):
-    namer.set('name', value)
 
+def get_workload_hash(processes) -> str:
+    """Returns a hash of the processes (rows of [name, duration, arrival time]) of a session."""
+    return hashlib.sha256(json.dumps(processes).encode()).hexdigest()
 
-@app.callback(
-    Output("duration-input", "value"),  #
-    [Input("duration-input", "value")]
-)
-def update_duration(value):
-    namer.set('duration', value)
 
+def start_job(function, previous, processes, *params):
+    """Submits function(processes, *params) as a job and cancels the previous one of the same kind, its result is not
+    needed anymore. The job gets a moment to finish right away - if it does, no poll is needed at all. The job data
+    goes to the browser and comes back with every poll, so it only holds the job's id, the hash of the processes and
+    the small params - enough to submit the job again, see resubmit_job."""
+    if previous:
+        jobs.cancel(previous['id'])
+    job = jobs.submit(function, processes, *params)
+    job.wait(timeout=0.2)
+    return {'id': job.id, 'workload': get_workload_hash(processes), 'params': list(params)}
 
-@app.callback(
-    Output("arrival-input", "value"),  #
-    [Input("arrival-input", "value")]
-)
-def update_arrival(value):
-    namer.set('arrival', value)
 
-
-@app.callback(
-    Output("clear-button", "children"),  #
-    [Input("clear-button", "n_clicks")]
-)
-def clear_processlist(n):
-    if n:
-        process_list.clear()
+def resubmit_job(function, job_data, processes):
+    """Submits the job of the job data again under the same id, if this worker process of the app doesn't know it: it
+    was submitted to another one, or its result was fetched already. With the cache that's cheap if the result was
+    simulated here before. Nothing happens if the processes are not the ones the job was started with anymore, a new
+    job is on its way then."""
+    if job_data and jobs.get(job_data['id']) is None and get_workload_hash(processes) == job_data['workload']:
+        jobs.submit(function, processes, *job_data['params'], job_id=job_data['id']).wait(timeout=0.2)
 
 
-# CALL BACKS FOR THE INFO STATS
-@app.callback(
-    Output("w-mean", "children"),
-    [Input('chart', 'children')]
-)
-def updated_w_mean(value):
-    return scheduler.stats[0]
+def asks_for_resubmit() -> bool:
+    """Tells if a callback was triggered by a poll that asked for its job to be submitted again."""
+    return dash.callback_context.triggered[0]['prop_id'].endswith('-resubmit.data')
 
 
 @app.callback(
-    Output("t-mean", "children"),
-    [Input('chart', 'children')]
-)
-def update_t_mean(value):
-    return scheduler.stats[2]
+    Output('chart-job', 'data'),
+    [Input('demo-dropdown', 'value'), Input('processes', 'data'), Input('slider', 'value'),
+     Input('graph', 'relayoutData'), Input('chart-resubmit', 'data')],
+    [State('chart-job', 'data')])
+def update_output(value, processes, quantum, relayout_data, resubmit, previous):
+    """This starts the simulation of the main gantt chart and the stats if the user changes the value of the dropdown
+    menu, the processes or the quantum. If the user zooms into the chart, it's built again with the details of the
+    new time range - that's a job as well, it might have to simulate once more."""
+    if asks_for_resubmit():
+        if resubmit['id'] == (previous or {}).get('id'):  # Not a poll of an older job that arrived late.
+            resubmit_job(simulate, previous, processes)
+        return dash.no_update
+    if value not in range(len(ALGORITHMS)):
+        value = 0  # Default is FCFS.
+    x_range = None
+    if dash.callback_context.triggered[0]['prop_id'] == 'graph.relayoutData':
+        x_range = get_x_range(relayout_data)
+        job = jobs.get(previous['id']) if previous else None
+        if x_range is False or previous is None or (job is not None and job.state == "running"):
+            return dash.no_update  # Nothing to zoom into yet.
+    return start_job(simulate, previous, processes, quantum, value, x_range)
 
 
 @app.callback(
-    Output("w-median", "children"),
-    [Input('chart', 'children')]
-)
-def update_w_median(value):
-    return scheduler.stats[1]
-
-
+    [Output('graph', 'figure'), Output('w-mean', 'children'), Output('t-mean', 'children'),
+     Output('w-median', 'children'), Output('t-median', 'children'), Output('chart-progress', 'children'),
+     Output('chart-poll', 'disabled'), Output('chart-resubmit', 'data')],
+    [Input('chart-job', 'data'), Input('chart-poll', 'n_intervals')])
+def poll_output(job_data, n):
+    """Shows the gantt chart and the stats as soon as the simulation is done, until then its progress."""
+    if not job_data:
+        return [dash.no_update] * 6 + [True, dash.no_update]
+    job = jobs.get(job_data['id'])
+    if job is None:  # This worker process doesn't know the job, update_output submits it again - the poll goes on.
+        return [dash.no_update] * 6 + [False, {'id': job_data['id'], 'poll': n}]
+    if job.state == "running":
+        return [dash.no_update] * 5 + [progress_bar(job), False, dash.no_update]
+    jobs.forget(job.id)  # The result is delivered now, it's not needed here anymore.
+    if job.state == "cancelled":
+        return [dash.no_update] * 6 + [True, dash.no_update]
+    if job.state == "failed":
+        return [dash.no_update] * 5 + [html.Div(f'The simulation failed: {job.future.exception()}'), True,
+                                       dash.no_update]
+    fig, stats = job.result()
+    return fig, stats[0], stats[2], stats[1], stats[3], None, True, dash.no_update
+
+
+# CALLBACK FOR THE ADD-A-NEW-PROCESS INPUT FIELD GROUP AND THE CLEAR BUTTON
 @app.callback(
-    Output("t-median", "children"),
-    [Input('chart', 'children')]
-)
-def update_w_median(value):
-    return scheduler.stats[3]
+    Output('processes', 'data'),
+    [Input("add-button", "n_clicks"), Input("clear-button", "n_clicks")],
+    [State("name-input", "value"), State("duration-input", "value"), State("arrival-input", "value"),
+     State('processes', 'data')],
+    prevent_initial_call=True)
+def update_processes(add_clicks, clear_clicks, name, duration, arrival, processes):
+    """This is the call back function for the Add and the Clear button. Add takes the values from the fields and if
+    everything needed is there, a new Process will be added to the processes of the session. Clear empties them."""
+    if dash.callback_context.triggered[0]['prop_id'] == 'clear-button.n_clicks':
+        return []
+    if name is None or duration is None or arrival is None:
+        return dash.no_update
+    processes = list(processes or [])
+    for p in processes:
+        # First we see if a process name already exists inside the list, if so: its values will get adjusted:
+        if p[0] == name:
+            processes.remove(p)
+            break
+    processes.append([name, int(duration), int(arrival)])
+    return processes
 
 
 # SLIDER CALL BACK
@@ -430,8 +465,6 @@ def update_w_median(value):
     Output('slider-text', 'children'),
     [Input('slider', 'value')])
 def update_slider(value):
-    namer.set("quantum", value)
-    scheduler.set_quantum(value)
     return f"Value: {value}"
 
 
@@ -447,10 +480,42 @@ def toggle_modal(n1, n2, is_open):
 
 
 @app.callback(
-    Output('bar-chart', 'figure'),  # Update the Bar Chart Figure.
-    [Input('compare', 'n_clicks')])
-def update_modal(is_open):
-    return get_comparison()
+    Output('compare-job', 'data'),
+    [Input('compare', 'n_clicks'), Input('compare-resubmit', 'data')],
+    [State('processes', 'data'), State('slider', 'value'), State('compare-job', 'data')],
+    prevent_initial_call=True)
+def update_modal(is_open, resubmit, processes, quantum, previous):
+    if asks_for_resubmit():
+        if resubmit['id'] == (previous or {}).get('id'):
+            resubmit_job(get_comparison, previous, processes)
+        return dash.no_update
+    return start_job(get_comparison, previous, processes, quantum)
+
+
+@app.callback(
+    [Output('bar-chart', 'figure'), Output('compare-progress', 'children'), Output('compare-poll', 'disabled'),
+     Output('compare-resubmit', 'data')],
+    [Input('compare-job', 'data'), Input('compare-poll', 'n_intervals')],
+    prevent_initial_call=True)
+def poll_modal(job_data, n):
+    """Updates the Bar Chart Figure as soon as the comparison is done, until then shows its progress."""
+    if not job_data:
+        return dash.no_update, dash.no_update, True, dash.no_update
+    job = jobs.get(job_data['id'])
+    if job is None:  # Unknown to this worker process, see poll_output.
+        return dash.no_update, dash.no_update, False, {'id': job_data['id'], 'poll': n}
+    if job.state == "running":
+        return dash.no_update, progress_bar(job), False, dash.no_update
+    jobs.forget(job.id)  # The result is delivered now, it's not needed here anymore.
+    if job.state == "cancelled":
+        return dash.no_update, dash.no_update, True, dash.no_update
+    if job.state == "failed":
+        return dash.no_update, html.Div(f'The comparison failed: {job.future.exception()}'), True, dash.no_update
+    return job.result(), None, True, dash.no_update
+
+
+if os.environ.get('PREWARM_COMPARISON'):  # Set it to run the comparison in the background right at the start.
+    prewarm()
 
 
 if __name__ == '__main__':